@@ -0,0 +1,214 @@
+"""
+Amazon search results parser with swappable HTML backends
+
+extract_items(html) pulls the raw fields (title, url, price, MRP, image,
+rating, reviews) out of every div[data-component-type='s-search-result'].
+Turning them into our product dicts stays in scrape_amazon.py.
+
+Backends (fastest first, default = fastest installed):
+- selectolax   pip install selectolax   (lexbor, C)
+- lxml         pip install lxml         (libxml2 + XPath)
+- bs4          BeautifulSoup "html.parser" (pure Python, the original)
+
+Every backend returns identical items; bench_amazon_parser.py checks that
+and times them against saved pages.
+"""
+
+import re
+
+AMAZON_ORIGIN = "https://www.amazon.in"
+RESULT_SELECTOR = "div[data-component-type='s-search-result']"
+
+_RATING_RE = re.compile(r"([\d.]+)")
+
+
+def _build_item(title, href, price_text, mrp_text, image, rating_text, reviews_text):
+    """
+    Shared field cleanup so every backend normalizes the same way.
+    Returns None for items we skip (no title / no price). Malformed numbers
+    raise ValueError, which callers treat as "skip this item".
+    """
+    if title is None:
+        return None
+    title = title.strip()
+
+    # Get URL
+    product_url = ""
+    if href:
+        product_url = AMAZON_ORIGIN + href if href.startswith("/") else href
+
+    # Price (skip if unavailable)
+    if price_text is None:
+        return None
+    price = float(price_text.replace(",", "").replace(".", ""))
+
+    # Original Price (MRP)
+    original_price = None
+    if mrp_text is not None:
+        txt = mrp_text.replace("₹", "").replace(",", "").strip()
+        if txt:
+            original_price = float(txt)
+
+    # Rating
+    rating = 4.0
+    if rating_text is not None:
+        match = _RATING_RE.search(rating_text)
+        if match:
+            rating = float(match.group(1))
+
+    # Reviews
+    reviews = 0
+    if reviews_text is not None:
+        reviews = int(reviews_text.replace(",", "").replace("(", "").replace(")", ""))
+
+    return {
+        "title": title,
+        "url": product_url,
+        "price": price,
+        "originalPrice": original_price,
+        "image": image or "",
+        "rating": rating,
+        "reviewsCount": reviews,
+    }
+
+
+def _collect(raw_items):
+    items = []
+    for fields in raw_items:
+        try:
+            item = _build_item(*fields)
+        except (ValueError, TypeError):
+            continue
+        if item:
+            items.append(item)
+    return items
+
+
+# --- bs4 (original) ---
+
+def _extract_bs4(html: str):
+    from bs4 import BeautifulSoup
+
+    def text(el):
+        return el.text if el else None
+
+    soup = BeautifulSoup(html, "html.parser")
+    for item in soup.select(RESULT_SELECTOR):
+        link_el = item.select_one("h2 a")
+        img_el = item.select_one("img.s-image")
+        yield (
+            text(item.select_one("h2 a span")),
+            link_el.get("href") if link_el else None,
+            text(item.select_one(".a-price-whole")),
+            text(item.select_one(".a-text-price .a-offscreen")),
+            img_el.get("src") if img_el else None,
+            text(item.select_one("span.a-icon-alt")),
+            text(item.select_one("span.a-size-base.s-underline-text")),
+        )
+
+
+# --- lxml (XPath, no cssselect dependency) ---
+
+def _has_class(*names):
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {n} ')" for n in names)
+
+_LXML_PATHS = None
+
+def _lxml_paths():
+    global _LXML_PATHS
+    if _LXML_PATHS is None:
+        from lxml import etree
+        _LXML_PATHS = {
+            "items": etree.XPath("//div[@data-component-type='s-search-result']"),
+            "title": etree.XPath(".//h2//a//span"),
+            "link": etree.XPath(".//h2//a"),
+            "price": etree.XPath(f".//*[{_has_class('a-price-whole')}]"),
+            "mrp": etree.XPath(f".//*[{_has_class('a-text-price')}]//*[{_has_class('a-offscreen')}]"),
+            "image": etree.XPath(f".//img[{_has_class('s-image')}]"),
+            "rating": etree.XPath(f".//span[{_has_class('a-icon-alt')}]"),
+            "reviews": etree.XPath(f".//span[{_has_class('a-size-base', 's-underline-text')}]"),
+        }
+    return _LXML_PATHS
+
+def _extract_lxml(html: str):
+    import lxml.html
+
+    paths = _lxml_paths()
+
+    def first(item, name):
+        found = paths[name](item)
+        return found[0] if found else None
+
+    def text(el):
+        return el.text_content() if el is not None else None
+
+    doc = lxml.html.fromstring(html)
+    for item in paths["items"](doc):
+        link_el = first(item, "link")
+        img_el = first(item, "image")
+        yield (
+            text(first(item, "title")),
+            link_el.get("href") if link_el is not None else None,
+            text(first(item, "price")),
+            text(first(item, "mrp")),
+            img_el.get("src") if img_el is not None else None,
+            text(first(item, "rating")),
+            text(first(item, "reviews")),
+        )
+
+
+# --- selectolax (lexbor) ---
+
+def _extract_selectolax(html: str):
+    from selectolax.lexbor import LexborHTMLParser
+
+    def text(el):
+        return el.text() if el is not None else None
+
+    tree = LexborHTMLParser(html)
+    for item in tree.css(RESULT_SELECTOR):
+        link_el = item.css_first("h2 a")
+        img_el = item.css_first("img.s-image")
+        yield (
+            text(item.css_first("h2 a span")),
+            link_el.attributes.get("href") if link_el is not None else None,
+            text(item.css_first(".a-price-whole")),
+            text(item.css_first(".a-text-price .a-offscreen")),
+            img_el.attributes.get("src") if img_el is not None else None,
+            text(item.css_first("span.a-icon-alt")),
+            text(item.css_first("span.a-size-base.s-underline-text")),
+        )
+
+
+BACKENDS = {
+    "selectolax": _extract_selectolax,
+    "lxml": _extract_lxml,
+    "bs4": _extract_bs4,
+}
+
+def available_backends() -> list:
+    """Installed backends, fastest first"""
+    modules = {"selectolax": "selectolax.lexbor", "lxml": "lxml.html", "bs4": "bs4"}
+    found = []
+    for name, module in modules.items():
+        try:
+            __import__(module)
+            found.append(name)
+        except ImportError:
+            continue
+    return found
+
+_default_backend = None
+
+def default_backend() -> str:
+    global _default_backend
+    if _default_backend is None:
+        installed = available_backends()
+        if not installed:
+            raise ImportError("No HTML parser installed (pip install selectolax, lxml or beautifulsoup4)")
+        _default_backend = installed[0]
+    return _default_backend
+
+def extract_items(html: str, backend: str = None) -> list:
+    """Raw item fields for every search result on the page (see _build_item)"""
+    return _collect(BACKENDS[backend or default_backend()](html))
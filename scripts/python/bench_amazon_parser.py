@@ -0,0 +1,91 @@
+"""
+Benchmark the amazon_parser.py backends against saved HTML pages
+
+Times extract_items() per page for every installed backend and checks that
+they all return the same items. A page no backend finds any items on makes
+the run fail, so the comparison always has results to compare.
+
+Usage:
+    python bench_amazon_parser.py                            # every Amazon page in dump/cache
+    python bench_amazon_parser.py page1.html page2.html      # saved search result pages
+    python bench_amazon_parser.py page1.html --cache --runs 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from amazon_parser import extract_items, available_backends
+from response_cache import ResponseCache
+
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def load_pages(args) -> list:
+    pages = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+
+    if args.cache or not args.files:
+        cache = ResponseCache()
+        for url in cache.urls():
+            if "amazon." in url:
+                pages.append((url, cache.get(url).decode("utf-8")))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="Saved HTML pages")
+    parser.add_argument("--cache", action="store_true", help="Also use every Amazon page in the response cache")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        parser.error("no pages to parse - pass saved Amazon search pages, or record some with scrape_amazon.py --cache")
+    backends = available_backends()
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"🏁 {len(pages)} page(s), {total_kb:.0f} KB - backends: {', '.join(backends)}")
+
+    results = {}
+    timings = {}
+    for backend in backends:
+        best = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            items = [extract_items(html, backend) for _, html in pages]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[backend] = items
+        timings[backend] = best
+
+    baseline = timings.get("bs4") or max(timings.values())
+    print(f"\n{'backend':<12}{'ms/page':>10}{'items':>8}{'speedup':>10}")
+    for backend in backends:
+        per_page = timings[backend] / len(pages) * 1000
+        items = sum(len(page_items) for page_items in results[backend])
+        print(f"{backend:<12}{per_page:>10.2f}{items:>8}{baseline / timings[backend]:>9.1f}x")
+
+    # Every backend must agree with the reference (bs4, or the first installed)
+    reference = "bs4" if "bs4" in results else backends[0]
+    failed = False
+    empty = [name for (name, _), items in zip(pages, results[reference]) if not items]
+    if empty:
+        print(f"\n❌ No items found on {len(empty)} page(s) - not Amazon search results? {empty[:5]}")
+        failed = True
+    for backend in backends:
+        if results[backend] != results[reference]:
+            mismatched = [name for (name, _), a, b in zip(pages, results[backend], results[reference]) if a != b]
+            print(f"\n⚠ {backend} disagrees with {reference} on: {mismatched[:5]}")
+            failed = True
+    if failed:
+        sys.exit(1)
+    print("\n✅ Every backend agrees")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Stream rows into Postgres with COPY ... FROM STDIN (CSV)
+
+Rows are encoded lazily as they're read, so a generator over a dump never
+gets materialized. Python lists become text[] literals, None becomes NULL.
+
+load_rows() is what the importers use: it COPYs straight into the table, or,
+when a conflict clause is given, into a temp copy of it followed by one
+INSERT ... SELECT ... ON CONFLICT. "createdAt"/"updatedAt" are filled with
+the transaction's timestamp (what NOW() would give) and the rate is printed.
+
+Usage:
+    copy_rows(cursor, "peora_staging", ["slug", "title", "images"], rows)
+    load_rows(cursor, "Product", PRODUCT_COLUMNS, rows, conflict="(slug) DO NOTHING")
+"""
+
+import csv
+import io
+import time
+
+NULL = "\\N"
+
+PRODUCT_COLUMNS = [
+    "id", "title", "slug", "description", "price", "originalPrice",
+    "discountPercentage", "rating", "reviewsCount", "itemsLeft",
+    "image", "images", "tags", "isFeatured", "isNew", "categoryId",
+]
+CATEGORY_COLUMNS = ["id", "name", "slug", "description", "image"]
+
+
+def pg_array(values) -> str:
+    """Python list -> Postgres array literal ({"a","b \\"c\\""})"""
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        else:
+            text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{text}"')
+    return "{" + ",".join(items) + "}"
+
+
+def _field(value):
+    if value is None:
+        return NULL
+    if isinstance(value, (list, tuple)):
+        return pg_array(value)
+    return value
+
+
+def encode_row(values) -> list:
+    """One row's values as COPY (FORMAT csv) fields"""
+    return [_field(v) for v in values]
+
+
+class _CSVStream(io.RawIOBase):
+    """File-like object that copy_expert() reads; encodes rows on demand"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.pending = b""
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow(encode_row(row))
+            self.count += 1
+            if self.buffer.tell() > 65536:
+                self._flush_buffer()
+        self._flush_buffer()
+        if size < 0:
+            size = len(self.pending)
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+    def _flush_buffer(self):
+        self.pending += self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+
+def copy_rows(cursor, table: str, columns: list, rows) -> int:
+    """COPY an iterable of tuples into `table`; returns the row count"""
+    stream = _CSVStream(rows)
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    cursor.copy_expert(
+        f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+        stream,
+    )
+    return stream.count
+
+
+def report(label: str, count: int, seconds: float):
+    print(f"   ⚡ {label}: {count} rows in {seconds:.2f}s ({count / max(seconds, 1e-6):,.0f} rows/s)")
+
+
+def load_rows(cursor, table: str, columns: list, rows, conflict: str = None,
+              timestamps: bool = True, quiet: bool = False, prepare=None) -> int:
+    """
+    Bulk-load tuples of `columns` into `table` ("Product", "Category"...).
+    Returns the rows read; with `conflict` (e.g. "(slug) DO NOTHING"),
+    cursor.rowcount afterwards is the number actually inserted, and
+    prepare(cursor, temp_table) can fix up the rows before they go in.
+    Can be called once per batch within a transaction.
+    """
+    started = time.monotonic()
+    if timestamps:
+        cursor.execute("SELECT LOCALTIMESTAMP")
+        now = cursor.fetchone()[0]
+        columns = list(columns) + ["createdAt", "updatedAt"]
+        rows = (tuple(row) + (now, now) for row in rows)
+
+    if conflict is None:
+        count = copy_rows(cursor, f'"{table}"', columns, rows)
+    else:
+        staging = f"_load_{table.lower()}"
+        cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE "{table}" INCLUDING DEFAULTS) ON COMMIT DROP')
+        cursor.execute(f"TRUNCATE {staging}")
+        count = copy_rows(cursor, staging, columns, rows)
+        if prepare:
+            prepare(cursor, staging)
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        cursor.execute(f'INSERT INTO "{table}" ({column_list}) SELECT {column_list} FROM {staging} ON CONFLICT {conflict}')
+
+    if not quiet:
+        report(f"{table} COPY", count, time.monotonic() - started)
+    return count
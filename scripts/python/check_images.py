@@ -1,35 +1,268 @@
+"""
+Check that every product image URL actually resolves
 
-import psycopg2
-# Load environment variables
+Streams (product id, image URL) pairs from the Product table through a
+server-side cursor, checks each unique URL once with HEAD (falling back to a
+1-byte GET when HEAD isn't allowed), and writes failures to the BrokenImage
+table in batches. Connections are pooled and capped per CDN host.
+
+--dump checks a dump file instead of the DB and writes
+dump/broken_images.ndjson - point it at a local HTTP server to test.
+
+Usage:
+    source ../.venv/bin/activate.fish
+    npx prisma db push                        # once, creates BrokenImage
+    python check_images.py
+    python check_images.py --concurrency 128 --per-host 16
+    python check_images.py --dump adore_products
+    python check_images.py --missing-source   # the old sample of products without a source
+"""
+
+import argparse
+import asyncio
 import os
+import time
+import uuid
+from collections import Counter
+
+import aiohttp
+import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
+
+import http_client
+from dump_io import NDJSONWriter, find_dump, iter_products
+
+# Load environment variables
 from pathlib import Path
-dotenv_path = Path(__file__).parent.parent.parent / ".env.local"
-load_dotenv(dotenv_path)
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+load_dotenv(os.path.join(BASE_DIR, ".env.local"))
+
+DUMP_DIR = os.path.join(BASE_DIR, "dump")
+BROKEN_FILE = os.path.join(DUMP_DIR, "broken_images.ndjson")
+
+HEAD_UNSUPPORTED = {403, 405, 501}  # some CDNs only answer GET
+
+
+def product_urls(image, images):
+    """Unique image URLs of one product, primary first"""
+    urls = [image or ""]
+    for url in images or []:
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+async def check_url(session, url: str):
+    """Returns (status, error) - error is None when the image resolves"""
+    if not url:
+        return None, "missing"
+    if not url.startswith(("http://", "https://")):
+        return None, "invalid url"
+
+    headers = http_client.get_headers()
+    try:
+        async with session.head(url, headers=headers, allow_redirects=True) as response:
+            status = response.status
+        if status in HEAD_UNSUPPORTED:
+            headers["Range"] = "bytes=0-0"
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                status = response.status
+    except asyncio.TimeoutError:
+        return None, "timeout"
+    except aiohttp.ClientError as e:
+        return None, type(e).__name__
+
+    if status >= 400:
+        return status, f"HTTP {status}"
+    return status, None
+
+
+async def run_checks(pairs, on_broken, concurrency: int, per_host: int, timeout: int):
+    """
+    Check (product id, url) pairs from the async iterator `pairs`.
+
+    Each URL is requested once however many products use it; on_broken(product_id,
+    url, status, error) is awaited for every failing pair; if it raises, the
+    run stops and the error propagates. Returns the stats.
+    """
+    stats = Counter()
+    results = {}  # url -> task
+    started = time.monotonic()
+
+    async with http_client.async_session(concurrency, limit_per_host=per_host, timeout=timeout) as session:
+        async def check(job):
+            product_id, url = job
+            task = results.get(url)
+            if task is None:
+                task = results[url] = asyncio.ensure_future(check_url(session, url))
+                stats["requests"] += 1
+            status, error = await task
+            stats["checked"] += 1
+            if error:
+                stats["broken"] += 1
+                stats[error] += 1
+                await on_broken(product_id, url, status, error)
+            if stats["checked"] % 1000 == 0:
+                rate = stats["checked"] / (time.monotonic() - started)
+                print(f"   🔎 {stats['checked']} checked, {stats['broken']} broken ({rate:.0f} URLs/s)")
+
+        try:
+            await http_client.run_workers(pairs, check, concurrency)
+        finally:
+            for task in results.values():
+                task.cancel()  # requests nobody is left to await after a failure
+
+    stats["seconds"] = time.monotonic() - started
+    return stats
+
+
+async def db_pairs(connection, batch: int):
+    """(product id, url) from a named (server-side) cursor, `batch` rows at a time"""
+    cursor = connection.cursor(name="image_check")
+    cursor.itersize = batch
+    await asyncio.to_thread(cursor.execute, 'SELECT id, image, images FROM "Product" ORDER BY id')
+    while True:
+        rows = await asyncio.to_thread(cursor.fetchmany, batch)
+        if not rows:
+            break
+        for product_id, image, images in rows:
+            for url in product_urls(image, images):
+                yield product_id, url
+    cursor.close()
+
+
+async def dump_pairs(filepath: str):
+    for p in iter_products(filepath):
+        for url in product_urls(p.get("image"), p.get("images")):
+            yield p["slug"], url
+
+
+class BrokenImageWriter:
+    """Buffers failures and writes them to "BrokenImage" in batches"""
+
+    def __init__(self, connection, batch: int):
+        self.connection = connection
+        self.batch = batch
+        self.rows = []
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "BrokenImage"')
+        self.connection.commit()
+
+    async def add(self, product_id, url, status, error):
+        self.rows.append((str(uuid.uuid4()), product_id, url, status, error))
+        if len(self.rows) >= self.batch:
+            await self.flush()
+
+    async def flush(self):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        await asyncio.to_thread(self._write, rows)
+
+    def _write(self, rows):
+        with self.connection.cursor() as cursor:
+            execute_values(cursor, '''
+                INSERT INTO "BrokenImage" (id, "productId", url, status, error, "checkedAt")
+                VALUES %s
+                ON CONFLICT ("productId", url) DO UPDATE
+                SET status = EXCLUDED.status, error = EXCLUDED.error, "checkedAt" = NOW()
+            ''', rows, template="(%s, %s, %s, %s, %s, NOW())")
+        self.connection.commit()
+
+
+def print_stats(stats):
+    print(f"\n✅ Checked {stats['checked']} image URLs ({stats['requests']} unique) "
+          f"in {stats['seconds']:.1f}s ({stats['checked'] / max(stats['seconds'], 0.001):.0f} URLs/s)")
+    print(f"   ❌ Broken: {stats['broken']}")
+    for key, count in stats.most_common():
+        if key not in ("checked", "requests", "broken", "seconds"):
+            print(f"      {key}: {count}")
+
+
+def show_missing_source(cursor):
+    # Check products with null source
+    cursor.execute('SELECT id, image, title FROM "Product" WHERE source IS NULL OR source = \'\' LIMIT 5')
+    rows = cursor.fetchall()
+
+    print("--- Sample Products with missing source ---")
+    for row in rows:
+        print(f"ID: {row[0]}")
+        print(f"Image: {row[1]}")
+        print(f"Title: {row[2]}")
+        print("---")
+
+
+async def check_dump(name: str, args):
+    filepath = find_dump(DUMP_DIR, name)
+    if not os.path.exists(filepath):
+        print(f"❌ File not found: {filepath}")
+        return
+    print(f"📦 Checking images in {os.path.basename(filepath)}")
+
+    with NDJSONWriter(BROKEN_FILE) as out:
+        async def on_broken(product_id, url, status, error):
+            out.write({"slug": product_id, "url": url, "status": status, "error": error})
+
+        stats = await run_checks(dump_pairs(filepath), on_broken, args.concurrency, args.per_host, args.timeout)
+    print_stats(stats)
+    print(f"📁 Saved broken URLs to {BROKEN_FILE}")
+
+
+async def check_db(database_url: str, args):
+    # Two connections: the named cursor's transaction stays open while batches commit
+    reader = psycopg2.connect(database_url)
+    writer = BrokenImageWriter(psycopg2.connect(database_url), args.batch)
+    print("✅ Connected to DB")
+    try:
+        writer.clear()
+        stats = await run_checks(db_pairs(reader, args.batch), writer.add, args.concurrency, args.per_host, args.timeout)
+        await writer.flush()
+        print_stats(stats)
+        print('📁 Broken URLs are in the "BrokenImage" table')
+    finally:
+        reader.close()
+        writer.connection.close()
+
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight overall")
+    parser.add_argument("--per-host", type=int, default=8, help="Requests in flight per image host")
+    parser.add_argument("--timeout", type=int, default=15, help="Seconds per URL")
+    parser.add_argument("--batch", type=int, default=500, help="Rows per cursor fetch / BrokenImage write")
+    parser.add_argument("--dump", help="Check a dump (e.g. adore_products) instead of the DB")
+    parser.add_argument("--missing-source", action="store_true",
+                        help="Only print a sample of products without a source")
+    args = parser.parse_args()
+
+    if args.dump:
+        asyncio.run(check_dump(args.dump, args))
+        return
+
     database_url = os.getenv("DIRECT_URL") or os.getenv("DATABASE_URL")
     if not database_url:
         print("❌ Database URL not found")
         return
-        
+
+    # Server-side cursors need a direct connection, not the pooler
+    if ":6543" in database_url:
+        database_url = database_url.replace(":6543", ":5432")
+    if "?" in database_url:
+        database_url = database_url.split("?")[0]
+
     try:
-        connection = psycopg2.connect(database_url)
-        cursor = connection.cursor()
-        
-        # Check products with null source
-        cursor.execute('SELECT id, image, title FROM "Product" WHERE source IS NULL OR source = \'\' LIMIT 5')
-        rows = cursor.fetchall()
-        
-        print("--- Sample Products with missing source ---")
-        for row in rows:
-            print(f"ID: {row[0]}")
-            print(f"Image: {row[1]}")
-            print(f"Title: {row[2]}")
-            print("---")
-            
-        cursor.close()
-        connection.close()
+        if args.missing_source:
+            connection = psycopg2.connect(database_url)
+            cursor = connection.cursor()
+            show_missing_source(cursor)
+            cursor.close()
+            connection.close()
+            return
+
+        asyncio.run(check_db(database_url, args))
 
     except Exception as e:
         print(f"❌ Failed: {e}")
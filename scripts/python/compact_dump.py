@@ -0,0 +1,249 @@
+"""
+Compact binary dumps: zstd-compressed msgpack batches (.msgpack.zst)
+
+Each frame holds up to --batch products stored column by column:
+- category, categorySlug, source and tags are dictionary-encoded against one
+  string table for the whole file
+- image, images and sourceUrl are split into a dictionary-encoded URL prefix
+  (the CDN path up to and including the last "/") and the file name
+- everything else is a plain msgpack column
+Encoded columns are flat lists (codes, names, list lengths), so reading one
+back is a few C-level map() calls rather than a Python loop per value; a
+column with values that don't fit its encoding is simply stored as is.
+Frames only carry the dictionary entries they add, so the file is read (and
+written) as a stream. Fields a product doesn't have are listed per frame and
+left out again on read, so products round-trip exactly.
+
+dump_io.iter_products()/find_dump() pick .msgpack.zst up like the other
+formats (the newest file for a dump wins), so converting is all it takes.
+
+Usage:
+    python compact_dump.py dump/adore_products.json
+    python compact_dump.py dump/*_products.json --level 19 --verify
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from itertools import islice
+
+import msgpack
+import zstandard
+
+EXTENSION = ".msgpack.zst"
+MAGIC = b"RIDUMP\x01\n"
+BATCH_SIZE = 2048
+LEVEL = 10
+
+DICT_FIELDS = ("category", "categorySlug", "source")
+LIST_FIELDS = ("tags",)
+URL_FIELDS = ("image", "sourceUrl")
+URL_LIST_FIELDS = ("images",)
+_FRAME = struct.Struct(">I")
+
+
+def _all_string_lists(values: list) -> bool:
+    return all(isinstance(v, list) and all(isinstance(x, str) for x in v) for v in values)
+
+
+def _split(flat: list, lengths: list) -> list:
+    items = iter(flat)
+    return [list(islice(items, n)) for n in lengths]
+
+
+def _decode(encoding: str, payload, strings: list, prefixes: list) -> list:
+    if encoding == "dict":
+        return list(map(strings.__getitem__, payload))
+    if encoding == "dict_list":
+        codes, lengths = payload
+        return _split(list(map(strings.__getitem__, codes)), lengths)
+    if encoding == "url":
+        codes, names = payload
+        return list(map(str.__add__, map(prefixes.__getitem__, codes), names))
+    if encoding == "url_list":
+        codes, names, lengths = payload
+        return _split(list(map(str.__add__, map(prefixes.__getitem__, codes), names)), lengths)
+    return payload
+
+
+class CompactWriter:
+    """Same interface as dump_io.NDJSONWriter; a frame is written per batch"""
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, level: int = LEVEL):
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._strings = {}   # value -> code, shared by every frame
+        self._prefixes = {}
+        self._pending = []
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def write(self, product: dict):
+        self._pending.append(product)
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self._write_frame()
+
+    def write_many(self, products):
+        for p in products:
+            self.write(p)
+
+    def _code(self, table: dict, added: list, value):
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+            added.append(value)
+        return code
+
+    def _urls(self, added: list, urls: list):
+        codes, names = [], []
+        for url in urls:
+            cut = url.rfind("/") + 1
+            codes.append(self._code(self._prefixes, added, url[:cut]))
+            names.append(url[cut:])
+        return codes, names
+
+    def _encode(self, field: str, values: list, new_strings: list, new_prefixes: list):
+        """(encoding, payload) for one column"""
+        if field in DICT_FIELDS and all(v is None or isinstance(v, str) for v in values):
+            return "dict", [self._code(self._strings, new_strings, v) for v in values]
+        if field in LIST_FIELDS and _all_string_lists(values):
+            flat = [t for v in values for t in v]
+            return "dict_list", [[self._code(self._strings, new_strings, t) for t in flat], [len(v) for v in values]]
+        if field in URL_FIELDS and all(isinstance(v, str) for v in values):
+            return "url", list(self._urls(new_prefixes, values))
+        if field in URL_LIST_FIELDS and _all_string_lists(values):
+            codes, names = self._urls(new_prefixes, [u for v in values for u in v])
+            return "url_list", [codes, names, [len(v) for v in values]]
+        return "plain", values
+
+    def _write_frame(self):
+        products, self._pending = self._pending, []
+        if not products:
+            return
+        fields = []
+        for p in products:
+            for key in p:
+                if key not in fields:
+                    fields.append(key)
+
+        new_strings, new_prefixes = [], []
+        encodings, columns, missing = {}, {}, {}
+        for field in fields:
+            values = [p.get(field) for p in products]
+            absent = [i for i, p in enumerate(products) if field not in p]
+            if absent:
+                missing[field] = absent
+            encodings[field], columns[field] = self._encode(field, values, new_strings, new_prefixes)
+
+        frame = {"n": len(products), "fields": fields, "encodings": encodings, "columns": columns,
+                 "missing": missing, "strings": new_strings, "prefixes": new_prefixes}
+        data = self._compressor.compress(msgpack.packb(frame, use_bin_type=True))
+        self._file.write(_FRAME.pack(len(data)))
+        self._file.write(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._write_frame()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_compact(path: str):
+    """Yield products from a .msgpack.zst dump, one frame in memory at a time"""
+    decompressor = zstandard.ZstdDecompressor()
+    strings, prefixes = [], []
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{os.path.basename(path)} is not a compact dump")
+        while True:
+            header = f.read(_FRAME.size)
+            if not header:
+                return
+            data = f.read(_FRAME.unpack(header)[0]) if len(header) == _FRAME.size else b""
+            try:
+                frame = msgpack.unpackb(decompressor.decompress(data), raw=False)
+            except (zstandard.ZstdError, ValueError, struct.error):
+                # A crash mid-write leaves a torn last frame - everything before it is fine
+                print(f"   ⚠ {os.path.basename(path)} ends abruptly (interrupted write)")
+                return
+            strings.extend(frame["strings"])
+            prefixes.extend(frame["prefixes"])
+
+            columns = [_decode(frame["encodings"][field], frame["columns"][field], strings, prefixes)
+                       for field in frame["fields"]]
+            products = [dict(zip(frame["fields"], row)) for row in zip(*columns)]
+            for field, rows in frame["missing"].items():
+                for i in rows:
+                    del products[i][field]
+            yield from products
+
+
+def convert(path: str, batch_size: int = BATCH_SIZE, level: int = LEVEL) -> str:
+    """Write <dump>.msgpack.zst next to a .json/.ndjson(.gz) dump; returns its path"""
+    from dump_io import iter_products
+
+    base = path
+    for ext in (".ndjson.gz", ".ndjson", ".json"):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+            break
+    output = base + EXTENSION
+    with CompactWriter(output, batch_size=batch_size, level=level) as writer:
+        writer.write_many(iter_products(path))
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Dumps to convert (.json, .ndjson, .ndjson.gz)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help=f"Products per frame (default: {BATCH_SIZE})")
+    parser.add_argument("--level", type=int, default=LEVEL, help=f"zstd level (default: {LEVEL})")
+    parser.add_argument("--verify", action="store_true",
+                        help="Read both files back and compare every product (exit status 1 on any difference)")
+    args = parser.parse_args()
+
+    from dump_io import iter_products
+
+    failed = 0
+    for path in args.paths:
+        started = time.monotonic()
+        output = convert(path, args.batch, args.level)
+        elapsed = time.monotonic() - started
+        before, after = os.path.getsize(path), os.path.getsize(output)
+        print(f"📦 {os.path.basename(path)} -> {os.path.basename(output)} in {elapsed:.1f}s")
+        print(f"   {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB ({before / max(after, 1):.1f}x smaller)")
+
+        started = time.monotonic()
+        original = sum(1 for _ in iter_products(path))
+        read_original = time.monotonic() - started
+        started = time.monotonic()
+        compact = sum(1 for _ in iter_compact(output))
+        read_compact = time.monotonic() - started
+        print(f"   ⚡ read {original} products in {read_original:.2f}s -> {compact} in {read_compact:.2f}s "
+              f"({read_original / max(read_compact, 1e-6):.1f}x the original's read speed)")
+
+        if args.verify:
+            mismatches = sum(1 for a, b in zip(iter_products(path), iter_compact(output)) if a != b)
+            if mismatches or original != compact:
+                print(f"   ❌ {mismatches} products differ ({original} read back from the original, {compact} from the compact file)")
+                failed += 1
+            else:
+                print("   ✅ Every product round-trips")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
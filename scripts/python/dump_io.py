@@ -0,0 +1,188 @@
+"""
+Dump file helpers shared by the scrapers and importers
+
+Formats (picked by extension):
+- .json         one JSON array (the original format), parsed incrementally
+- .ndjson       one product per line, appended as pages are parsed
+- .ndjson.gz    same, gzip-compressed
+- .msgpack.zst  compact columnar batches (compact_dump.py; needs msgpack + zstandard)
+
+Usage:
+    with NDJSONWriter(path) as writer:
+        writer.write_many(products)     # flushed per call, survives crashes
+
+    for p in iter_products(find_dump(DUMP_DIR, "adore_products")):
+        ...
+"""
+
+import gzip
+import json
+import os
+import re
+
+DUMP_EXTENSIONS = [".json", ".ndjson", ".ndjson.gz", ".msgpack.zst"]
+CHUNK_SIZE = 1 << 16
+_DELIMITER = re.compile(r"[\s,\]]")
+
+
+def _open_text(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NDJSONWriter:
+    """Appends one product per line, flushing after every batch"""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.count = 0
+        self._file = _open_text(path, "a" if append else "w")
+
+    def write(self, product: dict):
+        self._file.write(json.dumps(product, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def write_many(self, products):
+        for p in products:
+            self.write(p)
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_json_array(f, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the items of a top-level JSON array as they're parsed, reading
+    `chunk_size` characters at a time: memory is one chunk plus one item,
+    however big the file. Each item is decoded with raw_decode(); one cut
+    off at the end of the buffer just waits for the next chunk. A number
+    has no closing character, so it is only decoded once the delimiter
+    after it has been read (`12.|5` must not yield 12). Anything but one
+    comma between items (or a trailing one) raises ValueError.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(chars: str):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    name = getattr(f, "name", "dump")
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError(f"expected a JSON array in {name}")
+    pos += 1
+    skip(" \t\r\n")
+    empty = buffer[pos:pos + 1] == "]"
+
+    count = 0
+    while not empty:
+        skip(" \t\r\n")
+        if pos >= len(buffer):
+            raise ValueError(f"{name} ends before the closing ]")
+        if buffer[pos] in "-0123456789":
+            match = _DELIMITER.search(buffer, pos)
+            if not match and not eof:
+                fill()
+                continue
+            end = match.start() if match else len(buffer)
+            item = json.loads(buffer[pos:end])
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+        yield item
+        count += 1
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+        # Items are separated by exactly one comma: a missing one means a corrupted dump
+        skip(" \t\r\n")
+        if pos >= len(buffer):
+            raise ValueError(f"{name} ends before the closing ]")
+        if buffer[pos] == "]":
+            break
+        if buffer[pos] != ",":
+            raise ValueError(f"{name}: expected ',' or ']' after item {count}, found {buffer[pos]!r}")
+        pos += 1
+
+    pos += 1
+    skip(" \t\r\n")
+    if pos < len(buffer):
+        raise ValueError(f"{name} has data after the closing ]")
+
+
+def iter_products(path: str):
+    """Yield products one by one from any dump format"""
+    if path.endswith(".msgpack.zst"):
+        from compact_dump import iter_compact
+        yield from iter_compact(path)
+        return
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from iter_json_array(f)
+        return
+
+    with _open_text(path, "r") as f:
+        try:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves a torn last line - skip it
+                    print(f"   ⚠ Skipping unreadable line {line_no} in {os.path.basename(path)}")
+        except EOFError:
+            # gzip stream cut off by a crash - everything flushed so far was read
+            print(f"   ⚠ {os.path.basename(path)} ends abruptly (interrupted write)")
+
+
+def find_dump(dump_dir: str, name: str) -> str:
+    """
+    Path of the newest dump for `name` (e.g. "adore_products") in any format.
+    Falls back to the .json path when none exist so callers can report it.
+    """
+    candidates = [os.path.join(dump_dir, name + ext) for ext in DUMP_EXTENSIONS]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return candidates[0]
+    return max(existing, key=os.path.getmtime)
+
+
+def dump_path(dump_dir: str, name: str, ndjson: bool = False, compress: bool = False) -> str:
+    if compress:
+        return os.path.join(dump_dir, name + ".ndjson.gz")
+    if ndjson:
+        return os.path.join(dump_dir, name + ".ndjson")
+    return os.path.join(dump_dir, name + ".json")
@@ -0,0 +1,253 @@
+"""
+Batch extraction of products from archived listing pages (no browser)
+
+Turns saved HTML pages (dump/meesho-jewelry.html, Amazon page_source dumps...)
+into product records shaped like the scraper dumps, so import_amazon_to_db.py
+and friends can load them. Pages are parsed in a process pool, one file per
+task, and written to an NDJSON dump as they come back.
+
+Each site has an extractor spec in SITES:
+- "marker": text that identifies the site's listing pages (--site auto)
+- "extract": a function returning raw items (Amazon reuses amazon_parser.py), or
+- "card" + "fields": CSS selectors for one product card and each field
+  (field = (css or None for the card itself, attribute or None for text))
+
+Usage:
+    python extract_offline.py dump/meesho-jewelry.html
+    python extract_offline.py archive/ --site amazon --workers 8 --gzip
+    python extract_offline.py archive/ --category Earrings --out meesho_products
+"""
+
+import argparse
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from amazon_parser import extract_items, AMAZON_ORIGIN
+from dump_io import NDJSONWriter, dump_path
+from slugs import slugify
+
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DUMP_DIR = os.path.join(BASE_DIR, "dump")
+
+PAGE_EXTENSIONS = (".html", ".htm")
+
+SITES = {
+    "amazon": {
+        "source": "Amazon.in",
+        "origin": AMAZON_ORIGIN,
+        "marker": "s-search-result",
+        "extract": extract_items,
+    },
+    "meesho": {
+        "source": "Meesho",
+        "origin": "https://www.meesho.com",
+        "marker": "NewProductCardstyled__",
+        "card": "a[href*='/p/']",
+        "fields": {
+            "title": ("p[class*='ProductTitle']", None),
+            "url": (None, "href"),
+            "price": ("[class*='PriceRow'] h5", None),
+            "originalPrice": ("[class*='PriceRow'] p", None),
+            "image": ("img", "src"),
+            "rating": ("[class*='Rating__StyledPill'] span", None),
+            "reviewsCount": ("[class*='RatingCount']", None),
+        },
+    },
+}
+
+# Title keywords -> category (first match wins, so specific ones go first)
+CATEGORIES = [
+    {"name": "Mangalsutra", "slug": "mangalsutra", "pattern": r"\bmangal\s?sutras?\b|\bmanglsutra"},
+    {"name": "Anklets", "slug": "anklets", "pattern": r"\banklets?\b|\bpayals?\b|\btoe rings?\b"},
+    {"name": "Earrings", "slug": "earrings", "pattern": r"\bearrings?\b|\bjhum[kh]+i|\bstuds?\b"},
+    {"name": "Bangles", "slug": "bangles", "pattern": r"\bbangles?\b|\bkadas?\b"},
+    {"name": "Bracelets", "slug": "bracelets", "pattern": r"\bbracelets?\b|\bbarclets?\b"},
+    {"name": "Rings", "slug": "rings", "pattern": r"\brings?\b"},
+    {"name": "Necklaces", "slug": "necklaces", "pattern": r"\bnecklaces?\b|\bchains?\b|\bpendants?\b|\bsets?\b"},
+]
+_CATEGORY_RES = [(cat, re.compile(cat["pattern"], re.IGNORECASE)) for cat in CATEGORIES]
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def detect_site(html: str) -> str:
+    for name, spec in SITES.items():
+        if spec["marker"] in html:
+            return name
+    return None
+
+
+def categorize(title: str, default: dict = None) -> dict:
+    for cat, pattern in _CATEGORY_RES:
+        if pattern.search(title):
+            return cat
+    return default or CATEGORIES[-1]
+
+
+def _number(text):
+    if not text:
+        return None
+    match = _NUMBER_RE.search(text)
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+# --- Spec-driven extraction (selectolax, or bs4 if that's all there is) ---
+
+def _spec_cards(html: str, spec: dict):
+    """Yields {field: raw text/attribute} for every card matched by the spec"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        cards = LexborHTMLParser(html).css(spec["card"])
+        first = lambda node, css: node.css_first(css)
+        attr = lambda node, name: node.attributes.get(name)
+        text = lambda node: node.text(separator=" ")
+    except ImportError:
+        from bs4 import BeautifulSoup
+        cards = BeautifulSoup(html, "html.parser").select(spec["card"])
+        first = lambda node, css: node.select_one(css)
+        attr = lambda node, name: node.get(name)
+        text = lambda node: node.get_text(" ")
+
+    for card in cards:
+        raw = {}
+        for field, (css, attribute) in spec["fields"].items():
+            node = card if css is None else first(card, css)
+            if node is None:
+                raw[field] = None
+            else:
+                raw[field] = attr(node, attribute) if attribute else " ".join(text(node).split())
+        yield raw
+
+
+def _extract_spec(html: str, spec: dict) -> list:
+    items = []
+    for raw in _spec_cards(html, spec):
+        price = _number(raw.get("price"))
+        if not raw.get("title") or price is None:
+            continue
+        url = raw.get("url") or ""
+        items.append({
+            "title": raw["title"],
+            "url": spec["origin"] + url if url.startswith("/") else url,
+            "price": price,
+            "originalPrice": _number(raw.get("originalPrice")),
+            "image": raw.get("image") or "",
+            "rating": _number(raw.get("rating")) or 4.0,
+            "reviewsCount": int(_number(raw.get("reviewsCount")) or 0),
+        })
+    return items
+
+
+def extract_page(path: str, site: str = None):
+    """Worker task: (path, site, raw items) for one saved page"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    site = site or detect_site(html)
+    if site is None:
+        return path, None, []
+    spec = SITES[site]
+    items = spec["extract"](html) if "extract" in spec else _extract_spec(html, spec)
+    return path, site, items
+
+
+def to_product(item: dict, site: str, category: dict) -> dict:
+    """Raw item -> the scrapers' product dict (what the importers read)"""
+    price = item["price"]
+    original_price = item["originalPrice"]
+    discount = 0
+    if original_price and original_price > price:
+        discount = int(((original_price - price) / original_price) * 100)
+
+    source = SITES[site]["source"]
+    return {
+        "title": item["title"],
+        "slug": slugify(item["title"]),
+        "description": f"Elegant {category['name']} from {source} collection. High quality craftsmanship.",
+        "price": price,
+        "originalPrice": original_price,
+        "discountPercentage": discount,
+        "rating": item["rating"],
+        "reviewsCount": item["reviewsCount"],
+        "itemsLeft": random.randint(10, 50),
+        "image": item["image"],
+        "images": [item["image"]],
+        "category": category["name"],
+        "categorySlug": category["slug"],
+        "tags": [category["slug"], site, "jewelry"],
+        "isFeatured": False,
+        "isNew": False,
+        "source": source,
+        "sourceUrl": item["url"],
+    }
+
+
+def find_pages(paths: list) -> list:
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                pages.extend(os.path.join(root, f) for f in files if f.lower().endswith(PAGE_EXTENSIONS))
+        else:
+            pages.append(path)
+    return sorted(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Saved HTML pages or directories of them")
+    parser.add_argument("--site", choices=["auto"] + list(SITES), default="auto",
+                        help="Extractor spec to use (default: detect per page)")
+    parser.add_argument("--category", choices=[c["name"] for c in CATEGORIES],
+                        help="Category for every product (default: from title keywords)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parser processes (default: one per core)")
+    parser.add_argument("--out", default="offline_products",
+                        help="Dump name in dump/ (default: offline_products)")
+    parser.add_argument("--gzip", action="store_true", help="Write .ndjson.gz instead of .ndjson")
+    args = parser.parse_args()
+
+    pages = find_pages(args.paths)
+    if not pages:
+        print("❌ No HTML pages found")
+        return
+    site = None if args.site == "auto" else args.site
+    fixed_category = next((c for c in CATEGORIES if c["name"] == args.category), None)
+
+    output_file = dump_path(DUMP_DIR, args.out, ndjson=True, compress=args.gzip)
+    print(f"🚀 Extracting {len(pages)} page(s) with {args.workers} workers -> {os.path.basename(output_file)}")
+
+    started = time.monotonic()
+    seen = set()
+    per_site = {}
+    skipped = 0
+    with NDJSONWriter(output_file) as writer, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        chunksize = max(1, len(pages) // (args.workers * 4))
+        for path, page_site, items in pool.map(extract_page, pages, [site] * len(pages), chunksize=chunksize):
+            if page_site is None:
+                skipped += 1
+                print(f"   ⚠ {os.path.basename(path)}: no extractor matched")
+                continue
+            page_products = []
+            for item in items:
+                product = to_product(item, page_site, fixed_category or categorize(item["title"]))
+                if product["slug"] in seen:
+                    continue  # Skip duplicates
+                seen.add(product["slug"])
+                page_products.append(product)
+            writer.write_many(page_products)
+            per_site[page_site] = per_site.get(page_site, 0) + len(page_products)
+        count = writer.count
+
+    elapsed = time.monotonic() - started
+    print(f"\n✅ {count} products from {len(pages) - skipped} page(s) in {elapsed:.1f}s "
+          f"({len(pages) / elapsed:.1f} pages/s)")
+    for name, n in sorted(per_site.items()):
+        print(f"   {name}: {n}")
+    print(f"📁 Saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Shared HTTP client layer for the scrapers
+
+- One keep-alive requests.Session per process, pooled per host, so every
+  page after the first reuses a warm TCP+TLS connection
+- aiohttp session factory with the same headers and per-host limits
+- run_workers(): a bounded queue feeding N workers that fails fast
+- gzip/deflate negotiation (+ brotli when the `brotli` package is installed)
+- Cached user-agent rotation pool: fake_useragent is only touched once
+- Async token buckets so each host gets its own polite request rate
+- Optional raw response cache (response_cache.py): record every page, or
+  replay a recorded crawl without touching the network
+
+Usage:
+    import http_client
+    response = http_client.get(url)
+
+    async with http_client.async_session(concurrency=8) as session:
+        status, headers, body = await http_client.fetch_async(session, url)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401 - urllib3 and aiohttp decode "br" when it's importable
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_TIMEOUT = 30
+POOL_HOSTS = 10        # Distinct hosts kept in the pool
+POOL_SIZE = 16         # Keep-alive connections per host
+UA_POOL_SIZE = 50      # User agents cached from fake_useragent
+
+# Used when fake_useragent can't load its data (offline, broken cache...)
+FALLBACK_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+]
+
+
+class UserAgentPool:
+    """Builds a list of user agents once, then rotates through it for free"""
+
+    def __init__(self, size: int = UA_POOL_SIZE):
+        self.size = size
+        self._agents = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            from fake_useragent import UserAgent
+            ua = UserAgent()
+            agents = list({ua.random for _ in range(self.size)})
+        except Exception as e:
+            print(f"   ⚠ fake_useragent unavailable ({e}), using built-in user agents")
+            agents = []
+        return agents or list(FALLBACK_USER_AGENTS)
+
+    def random(self) -> str:
+        if self._agents is None:
+            with self._lock:
+                if self._agents is None:
+                    self._agents = self._load()
+        return random.choice(self._agents)
+
+
+user_agents = UserAgentPool()
+
+def get_headers() -> dict:
+    return {
+        "User-Agent": user_agents.random(),
+        "Accept": "application/json, text/html,application/xhtml+xml",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": ACCEPT_ENCODING,
+    }
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Process-wide pooled session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                retries = Retry(
+                    total=2,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 502, 503, 504],
+                    respect_retry_after_header=True,
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=retries)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get(url: str, headers: dict = None, timeout: int = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """GET through the pooled session with a rotated user agent"""
+    request_headers = get_headers()
+    if headers:
+        request_headers.update(headers)
+    return get_session().get(url, headers=request_headers, timeout=timeout, **kwargs)
+
+
+# --- Raw response cache ---
+
+_cache = None
+_replay = False
+
+def use_cache(cache, replay: bool = False):
+    """
+    Record every 200 response body into `cache` (a ResponseCache).
+    With replay=True, fetch()/fetch_async() serve from the cache only.
+    """
+    global _cache, _replay
+    _cache = cache
+    _replay = replay
+
+def replaying() -> bool:
+    return _replay
+
+def _from_cache(url: str):
+    entry = _cache.entry(url)
+    if entry is None:
+        return 404, {}, b""
+    return entry.get("status", 200), {"ETag": entry.get("etag")}, _cache.read(entry["sha256"])
+
+def _record(url: str, status: int, headers, body: bytes):
+    if _cache is not None and status == 200:
+        _cache.put(url, body, status=status, etag=headers.get("ETag"))
+
+def fetch(url: str, headers: dict = None):
+    """GET returning (status, headers, body bytes), through the cache when configured"""
+    if _replay:
+        return _from_cache(url)
+    response = get(url, headers=headers)
+    _record(url, response.status_code, response.headers, response.content)
+    return response.status_code, response.headers, response.content
+
+async def fetch_async(session: aiohttp.ClientSession, url: str, headers: dict = None):
+    """Async fetch() on an async_session()"""
+    if _replay:
+        return _from_cache(url)
+    request_headers = get_headers()
+    if headers:
+        request_headers.update(headers)
+    async with session.get(url, headers=request_headers) as response:
+        body = await response.read()
+        _record(url, response.status, response.headers, body)
+        return response.status, response.headers, body
+
+
+def async_session(concurrency: int = 8, limit_per_host: int = None, timeout: int = DEFAULT_TIMEOUT) -> aiohttp.ClientSession:
+    """
+    aiohttp session with a keep-alive connector.
+
+    `concurrency` caps open connections overall, `limit_per_host` (defaults to
+    the same value) caps them per host. Must be created inside a running loop.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=limit_per_host or concurrency,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+    )
+
+
+async def run_workers(items, handle, concurrency: int):
+    """
+    Await handle(item) for every item of the async iterator `items`, on
+    `concurrency` workers fed through a bounded queue. If a worker (or the
+    producer) raises, everything else is cancelled and the error re-raised -
+    the producer would otherwise wait forever on a queue nobody drains.
+    """
+    jobs = asyncio.Queue(maxsize=concurrency * 4)
+
+    async def worker():
+        while True:
+            item = await jobs.get()
+            if item is None:
+                return
+            await handle(item)
+
+    async def produce():
+        async for item in items:
+            await jobs.put(item)
+        for _ in range(concurrency):
+            await jobs.put(None)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    tasks.append(asyncio.create_task(produce()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests/second with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so requests go out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host; hosts without an explicit rate get the default"""
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 1):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.buckets = {}
+
+    def set_rate(self, url: str, rate: float, burst: int = 1):
+        self.buckets[urlparse(url).netloc] = TokenBucket(rate, burst)
+
+    async def acquire(self, url: str):
+        host = urlparse(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.default_rate, self.default_burst)
+        await bucket.acquire()
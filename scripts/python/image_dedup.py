@@ -0,0 +1,328 @@
+"""
+Find the same product across sources by its picture (perceptual hash)
+
+1. --hash: download every product's primary image that has no hash yet,
+   compute a 64-bit dHash (Pillow) and store it in Product.imageHash (hex)
+2. --find: load all hashes into a NumPy uint64 array and report groups of
+   products whose hashes are within --distance bits of each other
+
+The search uses multi-index hashing: the 64 bits are split into
+--distance + 1 chunks, so any two hashes within the distance share at least
+one chunk exactly. Only pairs inside the same (chunk, value) bucket are
+compared, with a vectorized popcount - no pairwise Python loop. Buckets are
+compared in full whatever their size (big ones block by block), so nothing
+within the distance is missed; identical hashes (placeholder images shared
+by thousands of products) are collapsed to one value first.
+
+--dump hashes a dump's images instead (dump/<name>_image_hashes.ndjson).
+
+Usage:
+    source ../.venv/bin/activate.fish
+    npx prisma db push                      # once, adds Product.imageHash
+    python image_dedup.py --hash
+    python image_dedup.py --find --distance 6 --cross-source
+    python image_dedup.py --dump adore_products --hash --find
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+
+import aiohttp
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from PIL import Image
+from dotenv import load_dotenv
+
+import http_client
+from dump_io import NDJSONWriter, find_dump, iter_products
+
+# Load environment variables
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+load_dotenv(os.path.join(BASE_DIR, ".env.local"))
+
+DUMP_DIR = os.path.join(BASE_DIR, "dump")
+DUPLICATES_FILE = os.path.join(DUMP_DIR, "image_duplicates.json")
+
+HASH_SIZE = 8  # 8x8 comparisons = 64 bits
+BLOCK_PAIRS = 1 << 22  # distances computed at once when comparing a bucket (~32 MB)
+
+
+# --- Hashing ---
+
+def dhash(data: bytes) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour?"""
+    image = Image.open(io.BytesIO(data))
+    image.draft("L", (HASH_SIZE * 4, HASH_SIZE * 4))  # JPEG: decode at reduced size
+    pixels = np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+async def hash_images(rows, on_hash, concurrency: int, per_host: int, timeout: int):
+    """
+    Download + dHash (key, url) pairs from the async iterator `rows`; returns
+    (hashed, failed). An error from on_hash (the DB write) stops the run.
+    """
+    counts = {"hashed": 0, "failed": 0}
+    started = time.monotonic()
+
+    async with http_client.async_session(concurrency, limit_per_host=per_host, timeout=timeout) as session:
+        async def hash_one(job):
+            key, url = job
+            try:
+                status, _, body = await http_client.fetch_async(session, url)
+                if status != 200:
+                    raise ValueError(f"HTTP {status}")
+                value = await asyncio.to_thread(dhash, body)  # Pillow decodes without the GIL
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, OSError):
+                counts["failed"] += 1
+                return
+            counts["hashed"] += 1
+            await on_hash(key, f"{value:016x}")
+            done = counts["hashed"] + counts["failed"]
+            if done % 500 == 0:
+                print(f"   🖼️  {done} images ({done / (time.monotonic() - started):.0f}/s)")
+
+        await http_client.run_workers(rows, hash_one, concurrency)
+
+    return counts["hashed"], counts["failed"]
+
+
+# --- Near-duplicate search ---
+
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Set bits of each uint64, in an array of the same shape (numpy < 2 has no bitwise_count)"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return _BYTE_BITS[values.view(np.uint8).reshape(values.shape + (8,))].sum(axis=-1, dtype=np.uint8)
+
+
+def _bucket_pairs(hashes: np.ndarray, members: np.ndarray, max_distance: int) -> list:
+    """Matches among one bucket's (sorted) members, BLOCK_PAIRS distances at a time"""
+    matches = []
+    size = len(members)
+    step = max(1, BLOCK_PAIRS // size)
+    for start in range(0, size - 1, step):
+        rows = members[start:start + step]
+        distances = popcount(hashes[rows][:, None] ^ hashes[members[start:]][None, :]).astype(np.int64)
+        # only pairs with i < j: row k of the block pairs with columns after k
+        upper = np.arange(size - start)[None, :] > np.arange(len(rows))[:, None]
+        r, c = np.nonzero(upper & (distances <= max_distance))
+        if len(r):
+            matches.append(np.column_stack([rows[r], members[start + c], distances[r, c]]))
+    return matches
+
+
+def near_duplicate_pairs(hashes: np.ndarray, max_distance: int) -> np.ndarray:
+    """
+    Rows (i, j, distance), i < j, linking everything within max_distance bits.
+    Products with the very same hash are linked to the first of them only
+    (distance 0) rather than pairwise; group_pairs() gives the same groups.
+    """
+    hashes = hashes.astype(np.uint64)
+    values, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    same = np.flatnonzero(first[inverse] != np.arange(len(hashes)))
+    matches = [np.column_stack([first[inverse[same]], same, np.zeros(len(same), dtype=np.int64)])]
+
+    chunks = max_distance + 1
+    bounds = np.linspace(0, 64, chunks + 1).astype(int)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        mask = np.uint64((1 << int(hi - lo)) - 1)
+        keys = (values >> np.uint64(lo)) & mask
+        order = np.argsort(keys, kind="stable")
+        _, starts, sizes = np.unique(keys[order], return_index=True, return_counts=True)
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            # Verify the bucket's candidates right away so only real matches are kept
+            for found in _bucket_pairs(values, np.sort(order[start:start + size]), max_distance):
+                matches.append(np.column_stack([first[found[:, 0]], first[found[:, 1]], found[:, 2]]))
+
+    pairs = np.concatenate(matches).astype(np.int64)
+    if not len(pairs):
+        return np.empty((0, 3), dtype=np.int64)
+    pairs[:, :2] = np.sort(pairs[:, :2], axis=1)
+    return np.unique(pairs, axis=0)  # a pair can share several chunks
+
+
+def group_pairs(count: int, pairs: np.ndarray) -> list:
+    """Union-find over the pairs; returns groups (lists of indexes) with 2+ members"""
+    parent = np.arange(count)
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        a, b = root(i), root(j)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    groups = {}
+    for i in np.unique(pairs[:, :2]) if len(pairs) else []:
+        groups.setdefault(root(i), []).append(int(i))
+    return list(groups.values())
+
+
+def report(products: list, hashes: np.ndarray, args):
+    started = time.monotonic()
+    pairs = near_duplicate_pairs(hashes, args.distance)
+    groups = group_pairs(len(products), pairs)
+    if args.cross_source:
+        groups = [g for g in groups if len({products[i]["source"] for i in g}) > 1]
+    print(f"🔍 {len(pairs)} near-duplicate links in {len(products)} images "
+          f"({time.monotonic() - started:.2f}s), {len(groups)} groups")
+
+    output = []
+    for group in sorted(groups, key=len, reverse=True):
+        output.append([products[i] for i in group])
+    for group in output[:5]:
+        print("   ---")
+        for p in group:
+            print(f"   {p['source'] or '?':<20} {p['title'][:50]}")
+
+    with open(DUPLICATES_FILE, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    print(f"📁 Saved groups to {DUPLICATES_FILE}")
+
+
+# --- Sources ---
+
+async def run_dump(args):
+    filepath = find_dump(DUMP_DIR, args.dump)
+    if not os.path.exists(filepath):
+        print(f"❌ File not found: {filepath}")
+        return
+    hashes_file = os.path.join(DUMP_DIR, f"{args.dump}_image_hashes.ndjson")
+    products = {p["slug"]: p for p in iter_products(filepath)}
+
+    if args.hash:
+        async def rows():
+            for slug, p in products.items():
+                if p.get("image"):
+                    yield slug, p["image"]
+
+        with NDJSONWriter(hashes_file) as out:
+            async def on_hash(slug, value):
+                out.write({"slug": slug, "imageHash": value})
+            hashed, failed = await hash_images(rows(), on_hash, args.concurrency, args.per_host, args.timeout)
+        print(f"✅ Hashed {hashed} images ({failed} failed) -> {hashes_file}")
+
+    if args.find:
+        found, values = [], []
+        for row in iter_products(hashes_file):
+            p = products.get(row["slug"])
+            if p:
+                found.append({"slug": row["slug"], "title": p["title"], "source": p.get("source")})
+                values.append(int(row["imageHash"], 16))
+        report(found, np.array(values, dtype=np.uint64), args)
+
+
+async def hash_db(database_url: str, args):
+    reader = psycopg2.connect(database_url)
+    writer = psycopg2.connect(database_url)
+    pending = []
+
+    def write(rows):
+        with writer.cursor() as cursor:
+            execute_values(cursor, '''
+                UPDATE "Product" AS p SET "imageHash" = v.hash
+                FROM (VALUES %s) AS v(id, hash) WHERE p.id = v.id
+            ''', rows)
+        writer.commit()
+
+    async def on_hash(product_id, value):
+        pending.append((product_id, value))
+        if len(pending) >= args.batch:
+            rows = pending[:]
+            pending.clear()
+            await asyncio.to_thread(write, rows)
+
+    async def rows():
+        cursor = reader.cursor(name="image_hash")
+        where = "" if args.rehash else 'AND "imageHash" IS NULL'
+        await asyncio.to_thread(cursor.execute, f'SELECT id, image FROM "Product" WHERE image <> \'\' {where}')
+        while True:
+            batch = await asyncio.to_thread(cursor.fetchmany, args.batch)
+            if not batch:
+                break
+            for row in batch:
+                yield row
+        cursor.close()
+
+    try:
+        hashed, failed = await hash_images(rows(), on_hash, args.concurrency, args.per_host, args.timeout)
+        if pending:
+            write(pending)
+        print(f"✅ Hashed {hashed} images ({failed} failed)")
+    finally:
+        reader.close()
+        writer.close()
+
+
+def find_db(database_url: str, args):
+    connection = psycopg2.connect(database_url)
+    cursor = connection.cursor(name="image_find")
+    cursor.itersize = 10000
+    cursor.execute('SELECT slug, title, source, "imageHash" FROM "Product" WHERE "imageHash" IS NOT NULL')
+    products, values = [], []
+    for slug, title, source, value in cursor:
+        products.append({"slug": slug, "title": title, "source": source})
+        values.append(int(value, 16))
+    cursor.close()
+    connection.close()
+    report(products, np.array(values, dtype=np.uint64), args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hash", action="store_true", help="Hash primary images that have no hash yet")
+    parser.add_argument("--rehash", action="store_true", help="With --hash: hash every image again")
+    parser.add_argument("--find", action="store_true", help="Report near-duplicate groups")
+    parser.add_argument("--distance", type=int, default=6, help="Max differing bits (of 64) for a match")
+    parser.add_argument("--cross-source", action="store_true", help="Only report groups spanning 2+ sources")
+    parser.add_argument("--concurrency", type=int, default=32, help="Downloads in flight overall")
+    parser.add_argument("--per-host", type=int, default=8, help="Downloads in flight per image host")
+    parser.add_argument("--timeout", type=int, default=20, help="Seconds per image")
+    parser.add_argument("--batch", type=int, default=500, help="Rows per cursor fetch / hash write")
+    parser.add_argument("--dump", help="Work on a dump (e.g. adore_products) instead of the DB")
+    args = parser.parse_args()
+    if not (args.hash or args.find):
+        parser.error("nothing to do: pass --hash and/or --find")
+
+    if args.dump:
+        asyncio.run(run_dump(args))
+        return
+
+    database_url = os.getenv("DIRECT_URL") or os.getenv("DATABASE_URL")
+    if not database_url:
+        print("❌ Database URL not found")
+        return
+
+    # Server-side cursors need a direct connection, not the pooler
+    if ":6543" in database_url:
+        database_url = database_url.replace(":6543", ":5432")
+    if "?" in database_url:
+        database_url = database_url.split("?")[0]
+
+    try:
+        if args.hash:
+            asyncio.run(hash_db(database_url, args))
+        if args.find:
+            find_db(database_url, args)
+    except Exception as e:
+        print(f"❌ Failed: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,31 @@
 """
 Import Peora Jewellery data INTO EXISTING database (APPEND mode - no delete)
 Handles slug collisions intelligently - compares products before skipping
+The dump is COPYed into a temp staging table and classified with set-based
+SQL (new / duplicate / collision), so only counts come back to Python
+Near-duplicates (reworded titles at about the same price) are caught with a
+MinHash/LSH title index (title_index.py) and reported; they're imported
+unless --skip-near-duplicates (similar titles are often distinct designs)
+Products are read and normalized by import_pipeline.py (PeoraAdapter)
 
 Usage:
     source ../.venv/bin/activate.fish
     python import_peora_to_db.py
+    python import_peora_to_db.py --skip-near-duplicates   # don't import the flagged ones
+    python import_peora_to_db.py --upsert                 # also refresh products we already have
 """
 
+import argparse
 import psycopg2
 from dotenv import load_dotenv
 import json
 import os
-import uuid
-import hashlib
+import time
+
+from title_index import TitleIndex
+from slugs import lock_slugs, allocate_slugs
+from bulk_load import copy_rows, report
+from import_pipeline import ImportPipeline, SourceAdapter, category_ids, create_categories, database_url, DEFAULT_CATEGORIES
 
 # Load environment variables from parent .env.local
 from pathlib import Path
@@ -20,196 +33,221 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 load_dotenv(os.path.join(BASE_DIR, ".env.local"))
 
 DUMP_DIR = os.path.join(BASE_DIR, "dump")
+NEAR_DUPLICATES_FILE = os.path.join(DUMP_DIR, "peora_near_duplicates.json")
+PRICE_TOLERANCE = 0.1  # near-duplicate titles must also be within 10% on price
+STAGING_COLUMNS = [
+    "id", "slug", "title", "description", "price", "originalPrice", "discountPercentage",
+    "rating", "reviewsCount", "itemsLeft", "image", "images", "tags",
+    "isFeatured", "isNew", "categoryId", "source", "sourceUrl", "contentHash",
+    "near_duplicate",  # not a record field
+]
+# Refreshed on products we already have (--upsert); the made-up rating,
+# stock and flags stay as they are
+REFRESH_COLUMNS = [
+    "description", "price", "originalPrice", "discountPercentage",
+    "image", "images", "tags", "source", "sourceUrl", "contentHash",
+]
+
+
+class PeoraAdapter(SourceAdapter):
+    """Peora's collections mapped onto our standard categories"""
+    name = "peora_products"
+    source = "peora"
+    category_mapping = {
+        "jewellery-sets": "necklaces",
+        "earrings": "earrings",
+        "bangles-bracelets": "bracelets",
+        "handbags": "bracelets",
+        "chain-pendant": "pendants",
+        "rings": "rings",
+        "jewelry": "necklaces",
+        "bridal-jewellery": "necklaces",
+        "mangalsutra": "necklaces",
+        "bracelet": "bracelets",
+        "belly-chain": "anklets",
+        "hair-accessories": "necklaces",
+        "toe-rings": "rings",
+        "pendant-set": "pendants",
+        "apparel-accessories": "necklaces",
+        "necklace": "necklaces",
+        "anklet": "anklets",
+    }
+    default_category = "necklaces"
+    defaults = {"rating": 4.5, "reviewsCount": 25, "itemsLeft": 30}
+    title_length = 100
+    description_length = 500
+    max_images = 4
+    max_tags = 5
+
+    def category_slug(self, p):
+        return self.category_mapping.get(p.get("categorySlug", ""), self.default_category)
 
-def make_unique_slug(slug: str, existing_slugs: set) -> str:
-    """Generate a unique slug by appending a short hash"""
-    counter = 1
-    new_slug = slug
-    while new_slug in existing_slugs:
-        new_slug = f"{slug[:50]}-{counter}"
-        counter += 1
-    return new_slug
 
 def main():
-    # Try getting DIRECT_URL first (better for bulk imports)
-    database_url = os.getenv("DIRECT_URL")
-    
-    # Fallback to DATABASE_URL
-    if not database_url:
-        print("ℹ️ DIRECT_URL not found, using DATABASE_URL...")
-        database_url = os.getenv("DATABASE_URL")
-    else:
-        print("ℹ️ Using DIRECT_URL (Port 5432) for better stability...")
-    
-    if not database_url:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-near-duplicates", action="store_true",
+                        help="Don't import near-duplicate titles (default: import and report them)")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Update products already in the DB whose price, stock... changed")
+    args = parser.parse_args()
+
+    url = database_url()
+    if not url:
         print("❌ Database URL not found in .env.local")
         return
     
-    # Force use of port 5432 (Session mode/Direct) instead of 6543 (Transaction pooler)
-    # This fixes "prepared statement" errors and hangs during bulk inserts
-    if ":6543" in database_url:
-        print("⚠️ Detected Transaction Pooler (Port 6543). Switching to Direct Connection (Port 5432)...")
-        database_url = database_url.replace(":6543", ":5432")
-    
-    # Strip query params that psycopg2 doesn't understand (like ?pgbouncer=true)
-    if "?" in database_url:
-        database_url = database_url.split("?")[0]
-    
     print("🔌 Connecting to database...")
     
     try:
-        connection = psycopg2.connect(database_url)
+        connection = psycopg2.connect(url)
         cursor = connection.cursor()
         print("✅ Connection successful!")
         
-        # Load scraped data
-        with open(os.path.join(DUMP_DIR, "peora_products.json"), "r", encoding="utf-8") as f:
-            products = json.load(f)
-        
-        print(f"📦 Loaded {len(products)} products from Peora")
-        
-        # Map Peora categories to our standard categories
-        category_mapping = {
-            "jewellery-sets": "necklaces",
-            "earrings": "earrings",
-            "bangles-bracelets": "bracelets",
-            "handbags": "bracelets",
-            "chain-pendant": "pendants",
-            "rings": "rings",
-            "jewelry": "necklaces",
-            "bridal-jewellery": "necklaces",
-            "mangalsutra": "necklaces",
-            "bracelet": "bracelets",
-            "belly-chain": "anklets",
-            "hair-accessories": "necklaces",
-            "toe-rings": "rings",
-            "pendant-set": "pendants",
-            "apparel-accessories": "necklaces",
-            "necklace": "necklaces",
-            "anklet": "anklets",
-        }
-        
         # Get existing categories from DB
-        cursor.execute('SELECT slug, id FROM "Category"')
-        existing_categories = {row[0]: row[1] for row in cursor.fetchall()}
+        existing_categories = category_ids(cursor)
         print(f"📁 Found {len(existing_categories)} existing categories in DB")
         
         # If no categories exist, create them
         if not existing_categories:
             print("\n📁 No categories found - creating them...")
-            categories = [
-                {"name": "Necklaces", "slug": "necklaces"},
-                {"name": "Earrings", "slug": "earrings"},
-                {"name": "Bracelets", "slug": "bracelets"},
-                {"name": "Rings", "slug": "rings"},
-                {"name": "Pendants", "slug": "pendants"},
-                {"name": "Anklets", "slug": "anklets"},
-            ]
-            for cat in categories:
-                cat_id = str(uuid.uuid4())
-                cursor.execute(
-                    '''INSERT INTO "Category" (id, name, slug, description, image, "createdAt", "updatedAt")
-                       VALUES (%s, %s, %s, %s, %s, NOW(), NOW())''',
-                    (cat_id, cat["name"], cat["slug"], None, None)
-                )
-                existing_categories[cat["slug"]] = cat_id
+            existing_categories = create_categories(cursor, DEFAULT_CATEGORIES)
             connection.commit()
         
-        # Get existing products (slug, title, price) to compare
-        cursor.execute('SELECT slug, title, price FROM "Product"')
-        existing_products = {row[0]: {"title": row[1], "price": float(row[2])} for row in cursor.fetchall()}
-        existing_slugs = set(existing_products.keys())
-        print(f"📦 Found {len(existing_slugs)} existing products in DB")
+        pipeline = ImportPipeline(PeoraAdapter(DUMP_DIR), existing_categories)
+        print(f"📦 Reading Peora products from {os.path.basename(pipeline.adapter.path)}")
         
-        # Track duplicates for analysis
+        # Title index of the catalog (cached, only new rows are read)
+        title_index = TitleIndex.from_db(connection)
+
+        # Concurrent importers wait here until this one commits its slugs
+        lock_slugs(cursor)
+
+        # 1. Stream the dump into a staging table (the catalog never comes into Python)
+        print("\n🔍 Staging Peora products...")
+        cursor.execute(f'''
+            CREATE TEMP TABLE peora_staging (
+                row_id serial, id text, slug text, title text, description text, price float8,
+                "originalPrice" float8, "discountPercentage" int, rating float8,
+                "reviewsCount" int, "itemsLeft" int, image text, images text[], tags text[],
+                "isFeatured" bool, "isNew" bool, "categoryId" text, source text, "sourceUrl" text, "contentHash" text,
+                near_duplicate bool, final_slug text, status text, match_id text
+            ) ON COMMIT DROP
+        ''')
+
         potential_duplicates = []
-        true_duplicates = 0
-        slug_collisions = 0
-        
-        # Prepare batch data
-        batch_data = []
-        BATCH_SIZE = 500 # Larger batch for speed
-        
-        # 1. Filter out what's already there first (Pre-process)
-        print("\n🔍 Checking for new products...")
-        new_products = []
-        for p in products:
-            slug = p["slug"][:60]
-            
-            if slug in existing_slugs:
-                existing = existing_products.get(slug)
-                if existing:
-                    # Same name and roughly same price = true duplicate
-                    if p["title"][:50].lower() == existing["title"][:50].lower() and abs(p["price"] - existing["price"]) < 10:
-                        true_duplicates += 1
-                        continue
-                    else:
-                        # Different product, same slug = resolve collision
-                        slug_collisions += 1
-                        slug = make_unique_slug(slug, existing_slugs)
-            
-            # If we reach here, it's a new product or a resolved collision
-            p["final_slug"] = slug # Store it
-            new_products.append(p)
-            existing_slugs.add(slug)
-
-        print(f"   ⏭️  Skipped {true_duplicates} products already in DB")
-        print(f"   ✨ Found {len(new_products)} new products to import")
-
-        if not new_products:
+
+        def staged_rows():
+            for record in pipeline.records():
+                slug, title, price = record.slug, record.title, record.price
+
+                # Reworded title of something we already have (or earlier in this dump)?
+                # Same-slug matches are left to the exact duplicate check in SQL, and
+                # the product's own row from an earlier import isn't a match
+                tolerance = max(10, price * PRICE_TOLERANCE)
+                matches = [m for m in title_index.query(title, exclude_id=record.id)
+                           if m[0] != slug and (m[2] is None or abs(price - m[2]) <= tolerance)]
+                if matches:
+                    match_slug, similarity, match_price = matches[0]
+                    potential_duplicates.append({
+                        "slug": slug, "title": title, "price": price,
+                        "match": match_slug, "similarity": round(similarity, 2), "matchPrice": match_price,
+                    })
+                else:
+                    title_index.add(slug, title, price)
+
+                yield record.row(STAGING_COLUMNS[:-1]) + (bool(matches),)
+
+        started = time.monotonic()
+        total = copy_rows(cursor, "peora_staging", STAGING_COLUMNS, staged_rows())
+        report("Staging COPY", total, time.monotonic() - started)
+
+        # 2. Classify with set-based SQL, in priority order
+        #    (slugs repeated within the dump were already dropped by the pipeline)
+        #    duplicate: imported from Peora before (same id), or
+        #               same slug, same name and roughly same price in the DB
+        #    near:      MinHash match (with --skip-near-duplicates)
+        #    collision: same slug, different product -> gets "<prefix>-<n>"
+        cursor.execute('''
+            UPDATE peora_staging s SET status = 'duplicate', match_id = p.id
+            FROM "Product" p WHERE p.id = s.id
+        ''')
+        cursor.execute('''
+            UPDATE peora_staging s SET status = 'duplicate', match_id = p.id
+            FROM "Product" p
+            WHERE s.status IS NULL AND p.slug = s.slug
+              AND lower(left(p.title, 50)) = lower(left(s.title, 50)) AND abs(p.price - s.price) < 10
+        ''')
+        if args.skip_near_duplicates:
+            cursor.execute("UPDATE peora_staging SET status = 'near' WHERE status IS NULL AND near_duplicate")
+        cursor.execute('''
+            UPDATE peora_staging s SET status = 'collision'
+            FROM "Product" p WHERE s.status IS NULL AND p.slug = s.slug
+        ''')
+        cursor.execute("UPDATE peora_staging SET status = 'new', final_slug = slug WHERE status IS NULL")
+
+        # Collisions: next free suffix per prefix, over the catalog and this dump's slugs
+        allocate_slugs(cursor, "peora_staging", "s.status = 'collision'", column="final_slug", order="row_id")
+
+        cursor.execute("SELECT status, COUNT(*) FROM peora_staging GROUP BY status")
+        counts = dict(cursor.fetchall())
+        to_import = counts.get("new", 0) + counts.get("collision", 0)
+
+        # Duplicates are products we already have: refresh the ones that changed
+        # (never another store's product that happens to match; rows from before
+        # sources were tracked are claimed)
+        refreshed = 0
+        if args.upsert and counts.get("duplicate"):
+            cursor.execute('''
+                UPDATE "Product" p SET %s, "updatedAt" = NOW()
+                FROM peora_staging s
+                WHERE s.status = 'duplicate' AND p.id = s.match_id
+                  AND (p.source IS NULL OR p.source = s.source)
+                  AND p."contentHash" IS DISTINCT FROM s."contentHash"
+            ''' % ", ".join(f'"{c}" = s."{c}"' for c in REFRESH_COLUMNS))
+            refreshed = cursor.rowcount
+
+        pipeline.summary()
+        print(f"   ⏭️  Skipped {counts.get('duplicate', 0) - refreshed} products already in DB")
+        if args.upsert:
+            print(f"   🔄 Updated {refreshed} products whose content changed")
+        if potential_duplicates:
+            action = "skipped" if args.skip_near_duplicates else "flagged, imported anyway"
+            print(f"   🧬 {len(potential_duplicates)} near-duplicate titles {action} (see {os.path.basename(NEAR_DUPLICATES_FILE)})")
+            with open(NEAR_DUPLICATES_FILE, "w", encoding="utf-8") as f:
+                json.dump(potential_duplicates, f, indent=2, ensure_ascii=False)
+        print(f"   🔀 Resolved {counts.get('collision', 0)} slug collisions")
+        print(f"   ✨ Found {to_import} new products to import")
+
+        if not to_import:
+            if refreshed:
+                connection.commit()
+            else:
+                connection.rollback()
             print("\n✅ Nothing new to import!")
             return
 
-        # 2. Bulk Insert using execute_values (Fastest way)
-        from psycopg2.extras import execute_values
-        
-        print(f"\n🚀 Sending {len(new_products)} products to DB...")
-        
-        insert_query = '''INSERT INTO "Product" (
-            id, title, slug, description, price, "originalPrice", 
-            "discountPercentage", rating, "reviewsCount", "itemsLeft",
-            image, images, tags, "isFeatured", "isNew", "categoryId",
-            "createdAt", "updatedAt"
-        ) VALUES %s ON CONFLICT (slug) DO NOTHING'''
-
-        # Format everything into a list of tuples for the query
-        values = []
-        for p in new_products:
-            cat_slug = category_mapping.get(p.get("categorySlug", ""), "necklaces")
-            category_id = existing_categories.get(cat_slug) or existing_categories.get("necklaces")
-            
-            images = p.get("images", [p.get("image", "")])
-            if not images or not images[0]: images = [p.get("image", "")]
-            
-            tags = p.get("tags", [])
-            if not isinstance(tags, list): tags = [cat_slug, "jewelry"]
-
-            values.append((
-                str(uuid.uuid4()),
-                p["title"][:100],
-                p["final_slug"],
-                p.get("description", "")[:500],
-                float(p["price"]),
-                float(p.get("originalPrice")) if p.get("originalPrice") else None,
-                float(p.get("discountPercentage")) if p.get("discountPercentage") else None,
-                float(p.get("rating", 4.5)),
-                int(p.get("reviewsCount", 25)),
-                int(p.get("itemsLeft", 30)),
-                p.get("image", ""),
-                images[:4],
-                tags[:5],
-                bool(p.get("isFeatured", False)),
-                bool(p.get("isNew", False)),
-                category_id
-            ))
-
-        # This part handles the NOW() automatically if we don't pass them
-        template = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())"
-        
+        # 3. Insert straight from staging
+        print(f"\n🚀 Inserting {to_import} products...")
         try:
-            execute_values(cursor, insert_query, values, template=template, page_size=500)
+            started = time.monotonic()
+            cursor.execute('''
+                INSERT INTO "Product" (
+                    id, title, slug, description, price, "originalPrice",
+                    "discountPercentage", rating, "reviewsCount", "itemsLeft",
+                    image, images, tags, "isFeatured", "isNew", "categoryId",
+                    source, "sourceUrl", "contentHash", "createdAt", "updatedAt"
+                )
+                SELECT id, title, final_slug, description, price, "originalPrice",
+                       "discountPercentage", rating, "reviewsCount", "itemsLeft",
+                       image, images, tags, "isFeatured", "isNew", "categoryId",
+                       source, "sourceUrl", "contentHash", NOW(), NOW()
+                FROM peora_staging WHERE status IN ('new', 'collision')
+                ORDER BY row_id
+                ON CONFLICT (slug) DO NOTHING
+            ''')
+            report("Product insert", cursor.rowcount, time.monotonic() - started)
             connection.commit()
-            print(f"   ✅ Successfully imported {len(values)} products!")
+            print(f"   ✅ Successfully imported {cursor.rowcount} products!")
         except Exception as e:
             print(f"   ❌ Bulk insert failed: {e}")
             connection.rollback()
@@ -0,0 +1,630 @@
+"""
+Streaming import pipeline shared by the importers
+
+    read -> normalize -> categorize -> dedupe -> batch -> load
+
+Every stage is a generator, so a dump is never held in memory: products are
+read one at a time, turned into Product rows and COPYed in batches of
+--batch rows. What differs per store (dump name, category mapping, tags,
+defaults) lives in a small SourceAdapter subclass:
+
+    class PeoraAdapter(SourceAdapter):
+        name = "peora_products"
+        source = "peora"
+        def category_slug(self, p): ...
+
+run_import() is the importers' main(): connection, categories and the
+full reload / --swap / --upsert / append flow, so a script is just its
+adapter plus
+
+    add_arguments(parser)
+    run_import(AdoreAdapter(DUMP_DIR), DEFAULT_CATEGORIES, parser.parse_args())
+
+Usage:
+    adapter = AdoreAdapter(DUMP_DIR)
+    pipeline = ImportPipeline(adapter, category_ids(cursor))
+    read, inserted = pipeline.load(connection)               # commits per batch
+    read, inserted = pipeline.load(connection, append=True)  # keep the catalog, add new products
+    read, inserted = pipeline.load_parallel(database_url, workers=8)   # one txn per partition
+    counts = pipeline.upsert(connection)                     # only changed rows are written
+    copy_rows(cursor, "staging", IMPORT_COLUMNS, pipeline.rows())  # or stream it yourself
+
+Product ids are uuid5 of (source, store handle), so re-importing a dump maps
+every product onto the same row. "contentHash" covers the fields taken from
+the store (HASHED_FIELDS, not the scrapers' random ratings and stock);
+upsert() UPDATEs a row only when it changed and leaves the rest untouched.
+When adding to a catalog (append, upsert), a new product whose slug is taken
+gets "<prefix>-<n>" from slugs.allocate_slugs(), under the slug lock.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import attrgetter
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from dump_io import find_dump, iter_products
+from slugs import slugify, truncate_slug, lock_slugs, unlock_slugs, allocate_slugs, PREFIX_LENGTH
+from bulk_load import copy_rows, load_rows, report, PRODUCT_COLUMNS, CATEGORY_COLUMNS
+from product_record import ProductRecord
+from table_swap import create_shadow, drop_shadow, check_references, build_indexes, swap, validate
+
+IMPORT_COLUMNS = PRODUCT_COLUMNS + ["source", "sourceUrl", "contentHash"]
+# Made up by the scrapers (random.*) on every run, so never hashed or refreshed
+SYNTHETIC_FIELDS = ("rating", "reviewsCount", "itemsLeft", "isFeatured", "isNew")
+# What a refresh may change; id, slug and createdAt stay put
+UPDATE_COLUMNS = [c for c in IMPORT_COLUMNS if c not in ("id", "slug") + SYNTHETIC_FIELDS]
+# What comes from the store: a re-scrape of an unchanged product hashes the same
+HASHED_FIELDS = ["title", "description", "price", "originalPrice", "image", "images", "categorySlug", "sourceUrl"]
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "ri-store/product")
+BATCH_SIZE = 5000
+PARTITION_KEYS = {"slug": IMPORT_COLUMNS.index("slug"), "category": IMPORT_COLUMNS.index("categoryId")}
+_ABORT = object()  # queued to workers when reading the dump fails
+
+# Jewelry categories the stores' own taxonomies are mapped onto
+DEFAULT_CATEGORIES = [
+    {"name": "Necklaces", "slug": "necklaces", "description": "Beautiful necklaces and pendants"},
+    {"name": "Earrings", "slug": "earrings", "description": "Elegant earrings collection"},
+    {"name": "Bracelets", "slug": "bracelets", "description": "Stylish bracelets and bangles"},
+    {"name": "Rings", "slug": "rings", "description": "Statement rings collection"},
+    {"name": "Pendants", "slug": "pendants", "description": "Designer pendants"},
+    {"name": "Anklets", "slug": "anklets", "description": "Traditional anklets"},
+]
+
+
+def product_id(source: str, handle: str) -> str:
+    """Same store + same handle -> same id, on every import"""
+    return str(uuid.uuid5(ID_NAMESPACE, f"{source}:{handle}"))
+
+
+_hashed_fields = attrgetter(*HASHED_FIELDS)
+
+
+def content_hash(record: ProductRecord) -> str:
+    payload = json.dumps(_hashed_fields(record), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def category_ids(cursor) -> dict:
+    """slug -> id of the categories already in the DB"""
+    cursor.execute('SELECT slug, id FROM "Category"')
+    return dict(cursor.fetchall())
+
+
+def create_categories(cursor, categories: list) -> dict:
+    """Insert categories with fresh ids; returns slug -> id"""
+    ids = {cat["slug"]: str(uuid.uuid4()) for cat in categories}
+    load_rows(cursor, "Category", CATEGORY_COLUMNS, (
+        (ids[cat["slug"]], cat["name"], cat["slug"], cat.get("description"), cat.get("image"))
+        for cat in categories
+    ))
+    return ids
+
+
+def ensure_categories(cursor, categories: list) -> dict:
+    """Insert the categories that don't exist yet; returns slug -> id of all"""
+    load_rows(cursor, "Category", CATEGORY_COLUMNS, (
+        (str(uuid.uuid4()), cat["name"], cat["slug"], cat.get("description"), cat.get("image"))
+        for cat in categories
+    ), conflict="(slug) DO NOTHING", quiet=True)
+    return category_ids(cursor)
+
+
+def adopt_live_ids(cursor, shadow: str) -> int:
+    """
+    Before a --swap: products the live catalog already has (same slug, same
+    source, or no source yet) take their live id, so the rows pointing at
+    them (Review, CartItem, OrderItem...) survive the swap. Returns the count.
+    """
+    cursor.execute(f'''
+        UPDATE "{shadow}" s SET id = p.id
+        FROM "Product" p
+        WHERE p.slug = s.slug AND p.id <> s.id AND (p.source = s.source OR p.source IS NULL)
+          AND NOT EXISTS (SELECT 1 FROM "{shadow}" x WHERE x.id = p.id)
+    ''')
+    return cursor.rowcount
+
+
+class SourceAdapter:
+    """Turns one store's dump records into ProductRecords"""
+
+    name = None                  # dump name in dump/ (find_dump)
+    source = None                # Product.source ("adore"...) unless the dump says; keys the ids
+    default_category = None      # None: products without a category are skipped
+    defaults = {"rating": 4.0, "reviewsCount": 10, "itemsLeft": 50}
+    title_length = None
+    description_length = None
+    max_images = None
+    max_tags = None
+
+    def __init__(self, dump_dir: str):
+        if not self.source:
+            raise ValueError(f"{type(self).__name__} needs a source")
+        self.path = find_dump(dump_dir, self.name)
+
+    def read(self):
+        return iter_products(self.path)
+
+    def handle(self, p: dict) -> str:
+        """The store's own key for a product (Shopify handle)"""
+        return p.get("slug") or slugify(p["title"])
+
+    def category_slug(self, p: dict) -> str:
+        return p.get("categorySlug") or self.default_category
+
+    def tags(self, p: dict, category_slug: str) -> list:
+        tags = p.get("tags", [])
+        return [str(t) for t in tags] if isinstance(tags, list) else [category_slug, "jewelry"]
+
+    def images(self, p: dict) -> list:
+        images = p.get("images") or []
+        return images if images and images[0] else [p.get("image", "")]
+
+    def normalize(self, p: dict) -> ProductRecord:
+        category_slug = self.category_slug(p)
+        original_price = p.get("originalPrice")
+        discount = p.get("discountPercentage")
+        source = p.get("source") or self.source
+        return ProductRecord(
+            id=p.get("id") or product_id(source, self.handle(p)),
+            title=p["title"][:self.title_length],
+            slug=truncate_slug(p.get("slug") or slugify(p["title"])),
+            description=(p.get("description") or "")[:self.description_length],
+            price=float(p["price"]),
+            originalPrice=float(original_price) if original_price else None,
+            discountPercentage=int(float(discount)) if discount else discount,
+            rating=float(p.get("rating", self.defaults["rating"])),
+            reviewsCount=int(p.get("reviewsCount", self.defaults["reviewsCount"])),
+            itemsLeft=int(p.get("itemsLeft", self.defaults["itemsLeft"])),
+            image=p.get("image", ""),
+            images=self.images(p)[:self.max_images],
+            tags=self.tags(p, category_slug)[:self.max_tags],
+            isFeatured=bool(p.get("isFeatured", False)),
+            isNew=bool(p.get("isNew", False)),
+            categorySlug=category_slug,
+            source=source,
+            sourceUrl=p.get("sourceUrl"),
+        )
+
+
+class ImportPipeline:
+    def __init__(self, adapter: SourceAdapter, category_ids: dict, batch_size: int = BATCH_SIZE):
+        self.adapter = adapter
+        self.category_ids = category_ids
+        self.batch_size = batch_size
+        self.read_count = 0
+        self.uncategorized = 0
+        self.duplicates = 0
+        self.renamed = 0
+        self.unclaimed = 0
+        self._counts_lock = threading.Lock()  # resolve_slugs() runs in every partition
+
+    # --- Stages ---
+
+    def read(self):
+        for p in self.adapter.read():
+            self.read_count += 1
+            yield p
+
+    def normalize(self, products):
+        for p in products:
+            yield self.adapter.normalize(p)
+
+    def categorize(self, records):
+        fallback = self.category_ids.get(self.adapter.default_category)
+        for record in records:
+            category_id = self.category_ids.get(record.categorySlug, fallback)
+            if category_id is None:
+                self.uncategorized += 1
+                print(f"   ⚠ Skipping {record.title[:30]} - no category")
+                continue
+            record.categoryId = category_id
+            yield record
+
+    def dedupe(self, records):
+        """First record per slug wins (the DB's unique key)"""
+        seen = set()
+        for record in records:
+            if record.slug in seen:
+                self.duplicates += 1
+                continue
+            seen.add(record.slug)
+            yield record
+
+    def fingerprint(self, records):
+        for record in records:
+            record.contentHash = content_hash(record)
+            yield record
+
+    def records(self):
+        return self.fingerprint(self.dedupe(self.categorize(self.normalize(self.read()))))
+
+    def rows(self, columns: list = IMPORT_COLUMNS):
+        for record in self.records():
+            yield record.row(columns)
+
+    def batches(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    # --- Load ---
+
+    def resolve_slugs(self, cursor, staging: str):
+        """
+        Before staged rows go into "Product", for products not in it yet (by id):
+        - same slug, same source: imported before ids were deterministic,
+          keeps the live row's id
+        - same slug, no source (imported before sources were tracked): can't
+          tell whose it is, so the row is skipped ("unclaimed"); a full
+          reload or --swap claims it
+        - same slug, another source: a different product, gets a suffix
+        """
+        new = 'NOT EXISTS (SELECT 1 FROM "Product" q WHERE q.id = s.id)'
+        cursor.execute(f'''
+            UPDATE {staging} s SET id = p.id
+            FROM "Product" p
+            WHERE p.slug = s.slug AND p.source = s.source AND {new}
+        ''')
+        cursor.execute(f'''
+            DELETE FROM {staging} s USING "Product" p
+            WHERE p.slug = s.slug AND p.source IS NULL AND {new}
+        ''')
+        unclaimed = cursor.rowcount
+        renamed = allocate_slugs(cursor, staging, f'''
+            {new} AND EXISTS (SELECT 1 FROM "Product" p WHERE p.slug = s.slug)
+        ''')
+        with self._counts_lock:
+            self.unclaimed += unclaimed
+            self.renamed += renamed
+
+    def _load_batch(self, cursor, table: str, batch: list, append: bool, lock: bool = True) -> int:
+        """Load one batch; returns the rows inserted"""
+        if not append:
+            load_rows(cursor, table, IMPORT_COLUMNS, batch, quiet=True)
+            return len(batch)
+        if lock:
+            lock_slugs(cursor)
+        load_rows(cursor, table, IMPORT_COLUMNS, batch, conflict="(id) DO NOTHING", quiet=True,
+                  prepare=self.resolve_slugs)
+        return cursor.rowcount
+
+    def load(self, connection, append: bool = False, commit: bool = True, table: str = "Product"):
+        """
+        COPY every batch into `table`; returns (rows loaded, rows inserted).
+        append=True skips products already in the table (by id) and gives
+        new ones whose slug is taken a suffix.
+        """
+        cursor = connection.cursor()
+        started = time.monotonic()
+        loaded = inserted = 0
+        for batch in self.batches(self.rows()):
+            inserted += self._load_batch(cursor, table, batch, append)
+            loaded += len(batch)
+            if commit:
+                connection.commit()
+            print(f"   ✓ {loaded} products loaded...")
+        report(f"{self.adapter.name} pipeline", loaded, time.monotonic() - started)
+        cursor.close()
+        return loaded, inserted
+
+    def upsert(self, connection, commit: bool = True) -> dict:
+        """
+        Insert new products and UPDATE the ones whose contentHash changed;
+        unchanged rows get no write at all. Slugs are resolved like append
+        (resolve_slugs): a slug owned by another product is never taken over.
+        """
+        cursor = connection.cursor()
+        started = time.monotonic()
+        cursor.execute("SELECT LOCALTIMESTAMP")
+        now = cursor.fetchone()[0]
+        columns = IMPORT_COLUMNS + ["createdAt", "updatedAt"]
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        update_list = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in UPDATE_COLUMNS + ["updatedAt"])
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        loaded = 0
+        unclaimed = self.unclaimed
+
+        for batch in self.batches(self.rows()):
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS _upsert_product (LIKE "Product" INCLUDING DEFAULTS) ON COMMIT DROP')
+            cursor.execute("TRUNCATE _upsert_product")
+            copy_rows(cursor, "_upsert_product", columns, (row + (now, now) for row in batch))
+            lock_slugs(cursor)
+            self.resolve_slugs(cursor, "_upsert_product")
+            cursor.execute(f'''
+                INSERT INTO "Product" ({column_list})
+                SELECT {column_list} FROM _upsert_product
+                ON CONFLICT (id) DO UPDATE SET {update_list}
+                WHERE "Product"."contentHash" IS DISTINCT FROM EXCLUDED."contentHash"
+                RETURNING (xmax = 0)
+            ''')
+            written = [row[0] for row in cursor.fetchall()]
+            inserted = sum(written)
+            counts["inserted"] += inserted
+            counts["updated"] += len(written) - inserted
+            loaded += len(batch)
+            if commit:
+                connection.commit()
+            print(f"   ✓ {loaded} products checked...")
+
+        counts["unchanged"] = loaded - counts["inserted"] - counts["updated"] - (self.unclaimed - unclaimed)
+        report(f"{self.adapter.name} upsert", loaded, time.monotonic() - started)
+        cursor.close()
+        return counts
+
+    def load_parallel(self, database_url: str, workers: int = 4, partition_by: str = "slug",
+                      append: bool = False, table: str = "Product"):
+        """
+        Hash-partition the rows (by slug or category) and COPY each partition
+        over its own pooled connection, in one transaction per partition.
+        Python builds rows while the DB loads the previous batches; queues
+        are bounded, so memory stays at about 2 batches per worker.
+        Returns (rows loaded, rows inserted); raises RuntimeError once the
+        workers are done if any partition was rolled back.
+
+        With append=True the slug lock is held (on a separate session) for
+        the whole load, and rows are partitioned by slug prefix so each
+        prefix's suffixes are handed out by one partition only.
+        """
+        if append and partition_by != "slug":
+            print("   ℹ️ Appending partitions by slug (suffixes are allocated per slug prefix)")
+            partition_by = "slug"
+        key_index = PARTITION_KEYS[partition_by]
+        pool = ThreadedConnectionPool(1, workers + 1, database_url)
+        queues = [queue.Queue(maxsize=2) for _ in range(workers)]
+
+        def load_partition(n):
+            connection = pool.getconn()
+            cursor = connection.cursor()
+            loaded = inserted = 0
+            end = None  # the sentinel, once received
+            try:
+                while True:
+                    batch = queues[n].get()
+                    if batch is None or batch is _ABORT:
+                        end = batch
+                        break
+                    inserted += self._load_batch(cursor, table, batch, append, lock=False)
+                    loaded += len(batch)
+                if end is _ABORT:
+                    raise RuntimeError("reading the dump failed")
+                connection.commit()
+                return loaded, inserted
+            except Exception:
+                connection.rollback()
+                if end is None:
+                    while queues[n].get() not in (None, _ABORT):
+                        pass  # keep the reader from blocking on a dead partition
+                raise
+            finally:
+                cursor.close()
+                pool.putconn(connection)
+
+        check = pool.getconn()
+        with check.cursor() as cursor:
+            if append:
+                lock_slugs(cursor, session=True)
+            cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+            before = cursor.fetchone()[0]
+        check.commit()
+
+        print(f"   🔀 {workers} partitions by {partition_by}")
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(load_partition, n) for n in range(workers)]
+            buffers = [[] for _ in range(workers)]
+            end = None
+            try:
+                for row in self.rows():
+                    # by prefix, so slugs that share suffix counters stay together
+                    n = zlib.crc32(str(row[key_index])[:PREFIX_LENGTH].encode("utf-8")) % workers
+                    buffers[n].append(row)
+                    if len(buffers[n]) >= self.batch_size:
+                        queues[n].put(buffers[n])
+                        buffers[n] = []
+                for n, buffer in enumerate(buffers):
+                    if buffer:
+                        queues[n].put(buffer)
+            except BaseException:
+                end = _ABORT
+                raise
+            finally:
+                for q in queues:
+                    q.put(end)
+
+            results, failed = [], 0
+            for n, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failed += 1
+                    print(f"   ❌ Partition {n} rolled back: {e}")
+        loaded = sum(r[0] for r in results)
+        inserted = sum(r[1] for r in results)
+        report(f"{self.adapter.name} parallel pipeline", loaded, time.monotonic() - started)
+
+        # Consistency check: every committed partition's rows are there
+        with check.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+            after = cursor.fetchone()[0]
+            if append:
+                unlock_slugs(cursor)
+        check.commit()
+        pool.putconn(check)
+        pool.closeall()
+
+        if after == before + inserted:
+            print(f"   ✅ Consistency check passed ({before} + {inserted} = {after} products)")
+        else:
+            print(f"   ⚠ Consistency check: expected {before + inserted} products, found {after} "
+                  f"(another writer?)")
+        if failed:
+            raise RuntimeError(f"{failed} of {workers} partitions were rolled back "
+                               f"({inserted} rows from the others were committed)")
+        return loaded, inserted
+
+    def summary(self):
+        print(f"   📦 Read {self.read_count} products from {self.adapter.name}")
+        if self.duplicates:
+            print(f"   ⏭️  {self.duplicates} repeated slugs in the dump skipped")
+        if self.uncategorized:
+            print(f"   ⚠ {self.uncategorized} products without a category skipped")
+        if self.renamed:
+            print(f"   🔀 {self.renamed} slugs already taken by other products got a -<n> suffix")
+        if self.unclaimed:
+            print(f"   ⚠ {self.unclaimed} slugs belong to products with no source (imported before sources "
+                  f"were tracked) - skipped; a full reload or --swap takes them over")
+
+    @staticmethod
+    def upsert_summary(counts: dict):
+        print(f"   ✨ {counts['inserted']} new, 🔄 {counts['updated']} changed, "
+              f"⏭️  {counts['unchanged']} unchanged (no write)")
+
+
+# --- Importer entry point ---
+
+def database_url() -> str:
+    """DIRECT_URL (better for bulk loads) or DATABASE_URL, in a form psycopg2 takes"""
+    url = os.getenv("DIRECT_URL") or os.getenv("DATABASE_URL")
+    if not url:
+        return None
+    # Session mode/direct port instead of the transaction pooler ("prepared statement" errors)
+    if ":6543" in url:
+        url = url.replace(":6543", ":5432")
+    # Strip query params that psycopg2 doesn't understand (like ?pgbouncer=true)
+    return url.split("?")[0]
+
+
+def add_arguments(parser, append: bool = False):
+    """The flags run_import() understands"""
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help=f"Rows per COPY batch (default: {BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Load partitions in parallel over this many connections (default: 1)")
+    parser.add_argument("--partition", choices=list(PARTITION_KEYS), default="slug",
+                        help="How rows are split between workers (default: slug hash)")
+    if append:
+        parser.add_argument("--upsert", action="store_true",
+                            help="Also update products whose price, stock... changed (default: skip existing products)")
+    else:
+        parser.add_argument("--upsert", action="store_true",
+                            help="Keep the catalog: add new products, update changed ones, skip the rest")
+        parser.add_argument("--swap", action="store_true",
+                            help="Full reload into a shadow table, swapped in atomically (no empty catalog)")
+
+
+def run_import(adapter: SourceAdapter, categories: list, args, append: bool = False):
+    """
+    Import `adapter`'s dump. By default the catalog is replaced (DELETE, then
+    COPY); --swap loads it on the side instead, --upsert keeps it. With
+    append=True products are only added. `categories` are created (reload)
+    or added if missing; None uses the ones already in the DB. Any failure,
+    including a rolled-back partition, propagates so the process exits non-zero.
+    """
+    url = database_url()
+    if not url:
+        print("❌ Database URL not found in .env.local")
+        sys.exit(1)
+    if not os.path.exists(adapter.path):
+        print(f"❌ File not found: {adapter.path}")
+        sys.exit(1)
+
+    print("🔌 Connecting to database...")
+    connection = psycopg2.connect(url)
+    cursor = connection.cursor()
+    print("✅ Connection successful!")
+    print(f"📦 Reading products from {os.path.basename(adapter.path)}")
+
+    try:
+        if args.upsert or append:
+            category_id_map = ensure_categories(cursor, categories) if categories else category_ids(cursor)
+            connection.commit()
+            pipeline = ImportPipeline(adapter, category_id_map, batch_size=args.batch)
+
+            if args.upsert:
+                print("\n🔄 Upserting (products are matched by id, unchanged ones are skipped)...")
+                pipeline.upsert_summary(pipeline.upsert(connection))
+            else:
+                print("\n🚀 Importing products...")
+                if args.workers > 1:
+                    total, inserted = pipeline.load_parallel(url, args.workers, args.partition, append=True)
+                else:
+                    total, inserted = pipeline.load(connection, append=True)
+                print(f"✅ Successfully imported {inserted} of {total} products!")
+            pipeline.summary()
+            return
+
+        if args.swap:
+            # The live catalog stays up; categories are kept since products point at them
+            print("\n📁 Checking categories...")
+            category_id_map = ensure_categories(cursor, categories)
+            table = create_shadow(cursor, "Product")
+            connection.commit()
+            print(f"\n📦 Loading products into {table}...")
+        else:
+            print("\n🗑️  Clearing existing data...")
+            cursor.execute('DELETE FROM "Product"')
+            cursor.execute('DELETE FROM "Category"')
+            connection.commit()
+
+            print("\n📁 Creating categories...")
+            category_id_map = create_categories(cursor, categories)
+            for cat in categories:
+                print(f"   ✓ {cat['name']}")
+            connection.commit()
+            table = "Product"
+            print("\n📦 Creating products...")
+
+        pipeline = ImportPipeline(adapter, category_id_map, batch_size=args.batch)
+        try:
+            if args.workers > 1:
+                _, count = pipeline.load_parallel(url, args.workers, args.partition, table=table)
+            else:
+                _, count = pipeline.load(connection, table=table)
+        except Exception:
+            if args.swap:
+                # An incomplete catalog must not go live: the swap would cascade-delete
+                # the Reviews, CartItems... of every product it misses
+                connection.rollback()
+                drop_shadow(cursor, table)
+                connection.commit()
+                print(f"\n🧹 Dropped {table}; the live catalog is untouched")
+            raise
+
+        if args.swap:
+            print(f"\n🔗 {adopt_live_ids(cursor, table)} products keep their live ids")
+            check_references(cursor, "Product", table)
+            connection.commit()
+            print("\n🗂️  Building indexes on the loaded table...")
+            build_indexes(cursor, "Product", table)
+            connection.commit()
+            print("🔀 Swapping in the new catalog...")
+            constraints = swap(cursor, "Product", table)
+            connection.commit()
+            validate(cursor, constraints)
+            connection.commit()
+
+        print(f"\n✅ Import completed!")
+        print(f"   📁 {len(category_id_map)} categories")
+        print(f"   📦 {count} products imported")
+        pipeline.summary()
+
+    except Exception as e:
+        print(f"❌ Failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+        print("\n🔒 Connection closed.")
@@ -0,0 +1,78 @@
+"""
+Adaptive pacing for the browser scrapers (used by scrape_amazon.py)
+
+Replaces fixed sleeps with AIMD-style pacing shared by every browser:
+- each clean page load shrinks the gap between navigations (x0.85)
+- a timeout, captcha or empty result set doubles it (and the wait timeout
+  grows on timeouts), up to max_delay
+- wait() reserves the next navigation slot, so N browsers share one pace
+
+Page readiness itself is event-driven: callers poll the DOM (see
+scrape_amazon.load_page) instead of sleeping a fixed amount.
+
+Usage:
+    pacer = AdaptivePacer()
+    pacer.wait()                        # before driver.get()
+    pacer.success(load_seconds)         # results showed up
+    pacer.problem("captcha")            # or "timeout" / "empty"
+    print(pacer.report())               # delay, pages/minute, problems
+"""
+
+import random
+import threading
+import time
+
+SPEED_UP = 0.85
+BACK_OFF = 2.0
+JITTER = 0.25  # +/- fraction of the delay
+
+
+class AdaptivePacer:
+    def __init__(self, start_delay: float = 2.0, min_delay: float = 0.5, max_delay: float = 60.0,
+                 timeout: float = 10.0, min_timeout: float = 5.0, max_timeout: float = 30.0):
+        self.delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.next_slot = time.monotonic()
+        self.started = time.monotonic()
+        self.pages = 0
+        self.problems = {}
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Sleep until this caller's navigation slot (jittered current delay)"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.delay * random.uniform(1 - JITTER, 1 + JITTER)
+        if slot > now:
+            time.sleep(slot - now)
+
+    def success(self, load_seconds: float = None):
+        with self._lock:
+            self.pages += 1
+            self.delay = max(self.min_delay, self.delay * SPEED_UP)
+            if load_seconds is not None:
+                # Keep the wait timeout a few times above what loads actually take
+                self.timeout = min(self.max_timeout, max(self.min_timeout, load_seconds * 4))
+
+    def problem(self, kind: str):
+        """kind: "timeout", "captcha" or "empty" - backs off before the next navigation"""
+        with self._lock:
+            self.problems[kind] = self.problems.get(kind, 0) + 1
+            self.delay = min(self.max_delay, self.delay * BACK_OFF)
+            if kind == "timeout":
+                self.timeout = min(self.max_timeout, self.timeout * 1.5)
+            self.next_slot = max(self.next_slot, time.monotonic() + self.delay)
+
+    def pages_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.pages / elapsed * 60 if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        problems = ", ".join(f"{k}: {v}" for k, v in sorted(self.problems.items())) or "none"
+        return (f"{self.pages_per_minute():.1f} pages/min, delay {self.delay:.1f}s, "
+                f"timeout {self.timeout:.0f}s, problems: {problems}")
@@ -0,0 +1,145 @@
+"""
+Append-only journal for resumable scrapes (used by scrape_amazon.py)
+
+Instead of re-serializing the whole dump after every page, each page appends
+one line per new product plus one progress line to <dump>.journal.ndjson:
+
+    {"type": "product", "product": {...}}
+    {"type": "progress", "progress": {"Necklaces": 12, ...}}
+
+Every `compact_every` pages (and on close) the journal is folded into the
+JSON dump and the progress file, then truncated. Resuming streams the dump
+for slugs and replays the journal - nothing loads the full product list.
+"""
+
+import json
+import os
+
+from dump_io import iter_products
+
+COMPACT_EVERY = 25  # pages
+
+
+class ProgressJournal:
+    def __init__(self, dump_file: str, progress_file: str, compact_every: int = COMPACT_EVERY, track_progress: bool = True):
+        self.dump_file = dump_file
+        self.progress_file = progress_file
+        self.journal_file = dump_file + ".journal.ndjson"
+        self.compact_every = compact_every
+        self.track_progress = track_progress
+        self.progress = {}
+        self.pages_since_compact = 0
+        self._journal = None
+
+    def load(self):
+        """Returns (slugs, progress) from the last compacted dump + journal"""
+        slugs = set()
+        if self.track_progress and os.path.exists(self.progress_file):
+            try:
+                with open(self.progress_file, "r", encoding="utf-8") as f:
+                    self.progress = json.load(f)
+            except Exception:
+                pass
+
+        if os.path.exists(self.dump_file):
+            try:
+                for p in iter_products(self.dump_file):
+                    slugs.add(p["slug"])
+            except Exception as e:
+                print(f"   ⚠ Could not read {os.path.basename(self.dump_file)}: {e}")
+
+        replayed = 0
+        for record in self._journal_records():
+            if record.get("type") == "product":
+                slugs.add(record["product"]["slug"])
+                replayed += 1
+            elif record.get("type") == "progress" and self.track_progress:
+                self.progress = record["progress"]
+                self.pages_since_compact += 1
+        if replayed:
+            print(f"   🔄 Replayed {replayed} products from the journal")
+
+        return slugs, dict(self.progress)
+
+    def reset(self):
+        """Start from an empty dump (replay mode)"""
+        self._close_journal()
+        with open(self.dump_file, "w", encoding="utf-8") as f:
+            f.write("[]")
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.pages_since_compact = 0
+
+    def _journal_records(self):
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+
+    def _close_journal(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def record_page(self, products: list, progress: dict = None):
+        """Append one page's new products (+ progress) - O(page), not O(dump)"""
+        if self._journal is None:
+            self._journal = open(self.journal_file, "a", encoding="utf-8")
+
+        lines = [json.dumps({"type": "product", "product": p}, ensure_ascii=False) for p in products]
+        if progress is not None and self.track_progress:
+            self.progress = dict(progress)
+            lines.append(json.dumps({"type": "progress", "progress": self.progress}))
+        if lines:
+            self._journal.write("\n".join(lines) + "\n")
+            self._journal.flush()
+
+        self.pages_since_compact += 1
+        if self.pages_since_compact >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> int:
+        """Fold the journal into the dump + progress file; returns the dump size"""
+        self._close_journal()
+
+        seen = set()
+        count = 0
+        temp_file = self.dump_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as out:
+            out.write("[")
+
+            def write(product):
+                nonlocal count
+                if product["slug"] in seen:
+                    return  # crash between dump replace and journal truncate
+                seen.add(product["slug"])
+                text = json.dumps(product, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+                out.write((",\n  " if count else "\n  ") + text)
+                count += 1
+
+            if os.path.exists(self.dump_file):
+                for p in iter_products(self.dump_file):
+                    write(p)
+            for record in self._journal_records():
+                if record.get("type") == "product":
+                    write(record["product"])
+
+            out.write("\n]" if count else "]")
+        os.replace(temp_file, self.dump_file)
+
+        if self.track_progress:
+            with open(self.progress_file, "w", encoding="utf-8") as f:
+                json.dump(self.progress, f, indent=2)
+
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.pages_since_compact = 0
+        print(f"   🗜️  Compacted journal: {count} products in {os.path.basename(self.dump_file)}")
+        return count
+
+    def close(self):
+        self.compact()
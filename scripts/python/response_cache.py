@@ -0,0 +1,104 @@
+"""
+Content-addressed cache of raw scraper responses (dump/cache/)
+
+Every fetched body (Shopify JSON page, Amazon page_source...) is stored once,
+gzip-compressed, under its sha256:
+
+    dump/cache/objects/ab/ab12....gz
+    dump/cache/index.ndjson        {"url", "fetched_at", "sha256", "status", "etag"} per fetch
+
+Identical responses share one object, and the index keeps every (url, time)
+pair, so a crawl can be replayed as of any point in time without touching
+the network - handy after fixing a parser bug, and as an offline test harness.
+
+Usage:
+    cache = ResponseCache()
+    cache.put(url, body_bytes)
+    body = cache.get(url)                  # latest copy, or None
+    body = cache.get(url, before="2026-01-01T00:00:00+00:00")
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CACHE_DIR = os.path.join(BASE_DIR, "dump", "cache")
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_file = os.path.join(cache_dir, "index.ndjson")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._index = None  # url -> [entry, ...] in fetch order
+        self._lock = threading.Lock()
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], sha + ".gz")
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            index = {}
+            if os.path.exists(self.index_file):
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn last line from an interrupted run
+                        index.setdefault(entry["url"], []).append(entry)
+            self._index = index
+        return self._index
+
+    def put(self, url: str, body: bytes, status: int = 200, etag: str = None) -> str:
+        """Store a response body; returns its sha256"""
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_file = f"{path}.{os.getpid()}.tmp"
+                with gzip.open(temp_file, "wb") as f:
+                    f.write(body)
+                os.replace(temp_file, path)
+
+            entry = {
+                "url": url,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "sha256": sha,
+                "status": status,
+                "etag": etag,
+            }
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._load_index().setdefault(url, []).append(entry)
+
+        return sha
+
+    def entry(self, url: str, before: str = None) -> dict:
+        """Latest index entry for `url` (optionally fetched at/before a time)"""
+        entries = self._load_index().get(url, [])
+        if before:
+            cutoff = datetime.fromisoformat(before)
+            entries = [e for e in entries if datetime.fromisoformat(e["fetched_at"]) <= cutoff]
+        return entries[-1] if entries else None
+
+    def read(self, sha: str) -> bytes:
+        with gzip.open(self._object_path(sha), "rb") as f:
+            return f.read()
+
+    def get(self, url: str, before: str = None) -> bytes:
+        entry = self.entry(url, before)
+        if entry is None:
+            return None
+        return self.read(entry["sha256"])
+
+    def urls(self) -> list:
+        return list(self._load_index().keys())
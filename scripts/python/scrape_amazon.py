@@ -4,20 +4,55 @@ Features:
 - Scrapes multiple categories
 - Paginates through search results (Page 1-20+)
 - Extracts Price, MRP, Title, Image, Rating
-- Auto-saves progress to JSON
+- Auto-saves progress: each page is appended to a journal
+  (amazon_large_dump.json.journal.ndjson) and folded into the JSON dump
+  every 25 pages (progress_journal.py), so saving doesn't grow with the dump
+- Adaptive pacing (page_pacer.py): waits for results / captcha / empty page
+  in the DOM instead of fixed sleeps, speeds up on clean loads, backs off on
+  trouble and reports pages/minute
+- --ndjson / --gzip: append each page's products to an NDJSON dump instead
+  of rewriting the whole JSON file every page
+- --cache: keep every page_source in the raw response cache (dump/cache)
+- --replay: rebuild the dump from cached pages, no browser or network, into
+  amazon_large_dump_replay.*; it replaces the live dump only once every page
+  the crawl had reached was found in the cache
+- --parser: HTML backend for item extraction (selectolax / lxml / bs4)
+- --workers N: pool of N headless browsers (own profile each) pulling
+  (category, page) jobs from a shared queue
+- --parse-workers N: browsers only navigate and grab page_source; parsing
+  and product building run in a process pool behind a bounded queue
+
+Usage:
+    python scrape_amazon.py
+    python scrape_amazon.py --ndjson --gzip
+    python scrape_amazon.py --cache
+    python scrape_amazon.py --replay
+    python scrape_amazon.py --workers 4 --ndjson
+    python scrape_amazon.py --parse-workers 4
 """
 
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+import argparse
 import json
 import time
 import random
 import os
-import re
+import queue
+import shutil
 import sys
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from dump_io import NDJSONWriter, iter_products, dump_path
+from response_cache import ResponseCache
+from amazon_parser import extract_items, BACKENDS
+from progress_journal import ProgressJournal
+from page_pacer import AdaptivePacer
+from slugs import slugify
 
 # Output directory
 from pathlib import Path
@@ -25,6 +60,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DUMP_DIR = os.path.join(BASE_DIR, "dump")
 os.makedirs(DUMP_DIR, exist_ok=True)
 RAW_OUTPUT_FILE = os.path.join(DUMP_DIR, "amazon_large_dump.json")
+REPLAY_NAME = "amazon_large_dump_replay"  # --replay builds here, then replaces the live dump
 PROGRESS_FILE = os.path.join(DUMP_DIR, "scrape_progress.json")
 
 # Categories to scrape
@@ -40,60 +76,437 @@ CATEGORIES = [
 
 PAGES_TO_SCRAPE = 2 # Test run limit (Set to 400 for full run)
 
-def slugify(text: str) -> str:
-    text = text.lower().strip()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[\s_-]+', '-', text)
-    return text[:60]
-
-def save_progress(products, progress_dict):
-    """Save current products and page progress safely"""
-    # Save products
-    temp_file = RAW_OUTPUT_FILE + ".tmp"
-    with open(temp_file, "w", encoding="utf-8") as f:
-        json.dump(products, f, indent=2, ensure_ascii=False)
-    os.replace(temp_file, RAW_OUTPUT_FILE)
-    
-    # Save progress state
+def save_progress_state(progress_dict):
+    if progress_dict is None:
+        return  # replay mode leaves the live crawl's progress alone
     with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
         json.dump(progress_dict, f, indent=2)
-        
-    print(f"   💾 Saved {len(products)} products. Progress: {progress_dict}")
 
-def main():
-    print("🚀 Starting Deep Amazon Scraper (Resumable)...")
-    
-    # 1. Load Products
-    all_products = []
-    if os.path.exists(RAW_OUTPUT_FILE):
-        try:
-            with open(RAW_OUTPUT_FILE, "r") as f:
-                all_products = json.load(f)
-            print(f"   🔄 Loaded {len(all_products)} existing products.")
-        except:
-            pass
+def save_progress(journal, page_products, progress_dict):
+    """Journal this page's products and progress (compacts into the JSON dump periodically)"""
+    journal.record_page(page_products, progress_dict)
+    print(f"   💾 Journaled {len(page_products)} products. Progress: {progress_dict}")
 
-    existing_slugs = {p["slug"] for p in all_products}
-    
-    # 2. Load Progress
-    progress = {}
-    if os.path.exists(PROGRESS_FILE):
-        try:
-            with open(PROGRESS_FILE, "r") as f:
-                progress = json.load(f)
-            print(f"   🔄 Loaded progress: {progress}")
-        except:
-            pass
+def load_progress_state() -> dict:
+    try:
+        with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    # Start Browser
-    print("🌐 Launching Stealth Browser...")
+def finish_replay(replay_file: str, live_file: str, complete: bool, missing: list):
+    """Swap the replayed dump in for the live one, unless the replay fell short"""
+    if complete and not missing:
+        os.replace(replay_file, live_file)
+        print(f"📼 Replay complete: {os.path.basename(live_file)} replaced")
+        return
+    if missing:
+        pages = ", ".join(f"{name} p{page}" for name, page in missing[:5])
+        print(f"⚠ {len(missing)} crawled pages missing from the cache ({pages}{', ...' if len(missing) > 5 else ''})")
+    print(f"⚠ Replay incomplete: {os.path.basename(live_file)} left as it was, "
+          f"partial rebuild kept in {os.path.basename(replay_file)}")
+
+def append_progress(writer, page_products, progress_dict):
+    """Streaming mode: append just this page's products, then record progress"""
+    writer.write_many(page_products)
+    save_progress_state(progress_dict)
+    print(f"   💾 Appended {len(page_products)} products ({writer.count} this run). Progress: {progress_dict}")
+
+# --- Parse pipeline (process pool) ---
+
+_known_slugs = frozenset()
+_parse_backend = None
+
+class _SlugOverlay:
+    """Read-only startup slugs + this page's slugs, without copying the big set"""
+
+    def __init__(self, base):
+        self.base = base
+        self.added = set()
+
+    def __contains__(self, slug):
+        return slug in self.added or slug in self.base
+
+    def add(self, slug):
+        self.added.add(slug)
+
+def _init_parse_worker(known_slugs, backend):
+    global _known_slugs, _parse_backend
+    _known_slugs = known_slugs
+    _parse_backend = backend
+
+def _parse_job(html, cat, page):
+    # Dedup against everything known at startup happens here, in the worker;
+    # slugs found during this run are filtered by the pipeline afterwards
+    return parse_listing_page(html, cat, page, _SlugOverlay(_known_slugs), _parse_backend)
+
+class ParsePipeline:
+    """
+    Parses pages in worker processes while the browser fetches the next one.
+
+    At most `max_pending` pages wait for a parser; submit() blocks the browser
+    beyond that. Results are applied in submission order: dedup against slugs
+    found earlier in this run, then on_parsed(cat, page, products).
+    """
+
+    def __init__(self, workers: int, backend: str, existing_slugs: set, max_pending: int = None):
+        self.existing_slugs = existing_slugs
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_parse_worker,
+            initargs=(frozenset(existing_slugs), backend),
+        )
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        self.pending = deque()
+        self.lock = threading.Lock()
+
+    def submit(self, html: str, cat: dict, page: int, on_parsed):
+        self.slots.acquire()
+        future = self.pool.submit(_parse_job, html, cat, page)
+        with self.lock:
+            self.pending.append((future, cat, page, on_parsed))
+        future.add_done_callback(lambda _: self._drain())
+
+    def _drain(self):
+        with self.lock:
+            while self.pending and self.pending[0][0].done():
+                future, cat, page, on_parsed = self.pending.popleft()
+                self.slots.release()
+                try:
+                    products = future.result()
+                except Exception as e:
+                    print(f"      ⚠ Parsing {cat['name']} page {page} failed: {e}")
+                    continue
+                page_products = []
+                for product in products:
+                    if product["slug"] not in self.existing_slugs:
+                        self.existing_slugs.add(product["slug"])
+                        page_products.append(product)
+                on_parsed(cat, page, page_products)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self._drain()
+
+def make_driver(profile_dir: str = None):
+    """Headless stealth Chrome; pass profile_dir to isolate its profile"""
     options = uc.ChromeOptions()
     options.add_argument("--headless=new") # Run headless for background
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
     
-    driver = uc.Chrome(options=options)
+    return uc.Chrome(options=options, user_data_dir=profile_dir)
+
+# Polled by WebDriverWait: what the page turned into (falsy = still loading)
+PAGE_STATE_JS = """
+if (document.querySelector("div[data-component-type='s-search-result']")) return "results";
+if (document.querySelector("form[action*='validateCaptcha'], #captchacharacters")) return "captcha";
+if (document.readyState === "complete") return "empty";
+return null;
+"""
+IMAGES_LOADED_JS = "return Array.from(document.querySelectorAll('img.s-image')).every(img => img.complete);"
+
+def wait_for_results(driver, pacer):
+    """Wait until results, a captcha or an empty page shows up; returns (state, seconds)"""
+    started = time.monotonic()
+    try:
+        state = WebDriverWait(driver, pacer.timeout, poll_frequency=0.2).until(
+            lambda d: d.execute_script(PAGE_STATE_JS)
+        )
+    except TimeoutException:
+        state = "timeout"
+    return state, time.monotonic() - started
+
+def load_page(driver, page_url: str, page: int, pacer):
+    """Navigate to a results page and return its HTML (None if items never show up)"""
+    pacer.wait()
+    driver.get(page_url)
+    state, seconds = wait_for_results(driver, pacer)
+
+    if state != "results":
+        pacer.problem(state)
+        print(f"      ❌ {state.capitalize()} on page {page}. Backing off {pacer.delay:.1f}s and retrying once...")
+        pacer.wait()
+        driver.refresh()
+        state, seconds = wait_for_results(driver, pacer)
+        if state != "results":
+            pacer.problem(state)
+            return None
+
+    # Scroll down so lazy images get their src, then wait for them (not a fixed pause)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    try:
+        WebDriverWait(driver, 2, poll_frequency=0.1).until(lambda d: d.execute_script(IMAGES_LOADED_JS))
+    except TimeoutException:
+        pass
+
+    pacer.success(seconds)
+    print(f"      ⏱️  Loaded in {seconds:.1f}s - {pacer.report()}")
+    return driver.page_source
+
+def parse_listing_page(html: str, cat: dict, page: int, existing_slugs: set, backend: str = None) -> list:
+    """Extract new products from one search results page (skips known slugs)"""
+    items = extract_items(html, backend)
+    print(f"      Found {len(items)} items on page.")
+    
+    page_products = []
+    
+    for item in items:
+        title = item["title"]
+        slug = slugify(title)
+        if slug in existing_slugs:
+            continue # Skip duplicates
+
+        price = item["price"]
+        original_price = item["originalPrice"]
+        image = item["image"]
+
+        # Calculate Logic
+        discount = 0
+        if original_price and original_price > price:
+            discount = int(((original_price - price) / original_price) * 100)
+        
+        # Add to list
+        product = {
+            "title": title,
+            "slug": slug,
+            "description": f"Elegant {cat['name']} from Amazon collection. High quality craftsmanship.",
+            "price": price,
+            "originalPrice": original_price,
+            "discountPercentage": discount,
+            "rating": item["rating"],
+            "reviewsCount": item["reviewsCount"],
+            "itemsLeft": random.randint(10, 50),
+            "image": image,
+            "images": [image],
+            "category": cat["name"],
+            "categorySlug": cat["slug"],
+            "tags": [cat["slug"], "amazon", "jewelry"],
+            "isFeatured": False,
+            "isNew": page == 1, # Mark page 1 items as new
+            "source": "Amazon.in",
+            "sourceUrl": item["url"]
+        }
+        
+        page_products.append(product)
+        existing_slugs.add(slug)
+        print(f"      ✓ {title[:40]}... ₹{int(price)}")
+
+    return page_products
+
+def run_pool(workers: int, progress: dict, cache, pacer, handle_page, save_page):
+    """
+    Crawl with `workers` browsers pulling (category, page) jobs from one queue.
+
+    Jobs are interleaved across categories. Pages finish out of order, so
+    progress[category] only advances over the contiguous run of finished
+    pages - a resume re-visits anything after a gap (slugs dedupe it). When a
+    page keeps failing, the rest of that category is dropped, like the
+    single-browser loop's "Moving to next category".
+    """
+    jobs = queue.Queue()
+    pending = {
+        cat["name"]: list(range(progress.get(cat["name"], 0) + 1, PAGES_TO_SCRAPE + 1))
+        for cat in CATEGORIES
+    }
+    for index in range(PAGES_TO_SCRAPE):
+        for cat in CATEGORIES:
+            pages = pending[cat["name"]]
+            if index < len(pages):
+                jobs.put((cat, pages[index]))
+
+    for cat_name, pages in pending.items():
+        if not pages:
+            print(f"📦 Check {cat_name}: Already finished. Skipping.")
+    print(f"\n🧵 {jobs.qsize()} pages queued for {workers} browsers")
+
+    lock = threading.Lock()          # progress, saving
+    driver_lock = threading.Lock()   # uc patches chromedriver on start - one at a time
+    finished = {cat["name"]: set() for cat in CATEGORIES}
+    failed_at = {}
+    stop = threading.Event()
+
+    def advance(cat_name):
+        last = progress.get(cat_name, 0)
+        while last + 1 in finished[cat_name]:
+            last += 1
+            finished[cat_name].discard(last)
+        progress[cat_name] = last
+
+    def worker(worker_id):
+        tag = f"[w{worker_id}]"
+        profile_dir = tempfile.mkdtemp(prefix=f"amazon-worker-{worker_id}-")
+        driver = None
+        try:
+            with driver_lock:
+                print(f"🌐 {tag} Launching Stealth Browser...")
+                driver = make_driver(profile_dir)
+
+            while not stop.is_set():
+                try:
+                    cat, page = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                cat_name = cat["name"]
+                with lock:
+                    if page > failed_at.get(cat_name, PAGES_TO_SCRAPE + 1):
+                        continue
+
+                print(f"\n   {tag} 📄 Scraping Page {page}/{PAGES_TO_SCRAPE} for {cat_name}...")
+                page_url = f"{cat['url']}&page={page}"
+                html = load_page(driver, page_url, page, pacer)
+                if html is None:
+                    print(f"      {tag} 🛑 Still failing. Dropping the rest of {cat_name}.")
+                    with lock:
+                        failed_at[cat_name] = min(page, failed_at.get(cat_name, page))
+                    continue
+                if cache:
+                    cache.put(page_url, html.encode("utf-8"))
+
+                def on_parsed(cat, page, page_products, tag=tag):
+                    with lock:
+                        print(f"      {tag} ✨ Added {len(page_products)} new products from {cat['name']} page {page}")
+                        finished[cat["name"]].add(page)
+                        advance(cat["name"])
+                        save_page(page_products, progress)
+
+                handle_page(html, cat, page, on_parsed)
+        except Exception as e:
+            print(f"\n❌ {tag} Worker stopped: {e}")
+        finally:
+            if driver:
+                driver.quit()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    threads = [threading.Thread(target=worker, args=(i + 1,), daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(0.5)
+    except KeyboardInterrupt:
+        print("\n� Stopping scraper (User Interrupt) - letting workers finish their page")
+        stop.set()
+        for t in threads:
+            t.join()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Append products to amazon_large_dump.ndjson page by page")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Like --ndjson but gzip-compressed (.ndjson.gz)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Store every page_source in the content-addressed cache (dump/cache)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-parse cached pages from page 1 instead of browsing (rebuilds the dump once "
+                             "every crawled page was in the cache)")
+    parser.add_argument("--parser", choices=list(BACKENDS),
+                        help="HTML parser backend (default: fastest installed, see amazon_parser.py)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Browsers crawling in parallel, each with its own profile (default: 1)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parse pages in a pool of N processes instead of on the browser's thread")
+    args = parser.parse_args()
+    streaming = args.ndjson or args.gzip
+    cache = ResponseCache() if args.cache or args.replay else None
+
+    print("🚀 Starting Deep Amazon Scraper (Resumable)...")
+    if args.replay:
+        print("📼 Replay mode: reading pages from the response cache")
+    
+    # 1. Load Products + Progress (a replay starts from scratch, on the side)
+    existing_slugs = set()
+    progress = {}
+    writer = None
+    journal = None
+    crawled = load_progress_state() if args.replay else {}  # pages the cache should have
+    missing = []
+    if streaming:
+        live_file = dump_path(DUMP_DIR, "amazon_large_dump", ndjson=True, compress=args.gzip)
+        output_file = dump_path(DUMP_DIR, REPLAY_NAME, ndjson=True, compress=args.gzip) if args.replay else live_file
+        if os.path.exists(output_file) and not args.replay:
+            existing_slugs = {p["slug"] for p in iter_products(output_file)}
+            print(f"   🔄 Found {len(existing_slugs)} existing products.")
+        writer = NDJSONWriter(output_file, append=not args.replay)
+        if os.path.exists(PROGRESS_FILE) and not args.replay:
+            try:
+                with open(PROGRESS_FILE, "r") as f:
+                    progress = json.load(f)
+                print(f"   🔄 Loaded progress: {progress}")
+            except:
+                pass
+    else:
+        # Resume = stream the last compacted dump for slugs + replay the journal
+        live_file = RAW_OUTPUT_FILE
+        output_file = dump_path(DUMP_DIR, REPLAY_NAME) if args.replay else live_file
+        journal = ProgressJournal(output_file, PROGRESS_FILE, track_progress=not args.replay)
+        if args.replay:
+            journal.reset()
+        else:
+            existing_slugs, progress = journal.load()
+            print(f"   🔄 Found {len(existing_slugs)} existing products.")
+            print(f"   🔄 Loaded progress: {progress}")
+    start_total = len(existing_slugs)
+
+    def save_page(page_products, page_progress):
+        if writer:
+            append_progress(writer, page_products, page_progress)
+        else:
+            save_progress(journal, page_products, page_progress)
+
+    # One pace for every browser: speeds up on clean loads, backs off on trouble
+    pacer = AdaptivePacer()
+
+    # Parsing: inline, or in a process pool while the browser moves on
+    pipeline = None
+    if args.parse_workers > 0:
+        pipeline = ParsePipeline(args.parse_workers, args.parser, existing_slugs)
+    parse_lock = threading.Lock()
+
+    def handle_page(html, cat, page, on_parsed):
+        if pipeline:
+            pipeline.submit(html, cat, page, on_parsed)
+            return
+        with parse_lock:
+            page_products = parse_listing_page(html, cat, page, existing_slugs, args.parser)
+        on_parsed(cat, page, page_products)
+
+    def on_parsed(cat, page, page_products):
+        print(f"      ✨ Added {len(page_products)} new products from {cat['name']} page {page}")
+        
+        # Update progress (a replay doesn't move the live crawl's progress)
+        if not args.replay:
+            progress[cat["name"]] = page
+        
+        # Save periodically
+        save_page(page_products, None if args.replay else progress)
+
+    if args.workers > 1 and not args.replay:
+        try:
+            run_pool(args.workers, progress, cache, pacer, handle_page, save_page)
+        finally:
+            if pipeline:
+                pipeline.close()
+            if writer:
+                writer.close()
+            if journal:
+                journal.close()
+            print("\n✅ Scraper Finished.")
+            if not args.replay:
+                print(f"⏱️  {pacer.report()}")
+            print(f"� Final Count: {len(existing_slugs)} products saved to {os.path.basename(output_file)} ({len(existing_slugs) - start_total} new)")
+        return
+
+    # Start Browser
+    complete = False
+    driver = None
+    if not args.replay:
+        print("🌐 Launching Stealth Browser...")
+        driver = make_driver()
     
     try:
         for cat in CATEGORIES:
@@ -107,8 +520,9 @@ def main():
             print(f"\n📦 Starting Category: {cat_name} (From Page {start_page})")
             
             base_url = cat["url"]
-            driver.get(base_url)
-            time.sleep(3)
+            if driver:
+                pacer.wait()
+                driver.get(base_url)
             
             for page in range(start_page, PAGES_TO_SCRAPE + 1):
                 print(f"\n   📄 Scraping Page {page}/{PAGES_TO_SCRAPE} for {cat_name}...")
@@ -116,146 +530,48 @@ def main():
                 # Verify URL has page param or navigate via click? Both work.
                 # Direct URL structure for Amazon pagination: &page=2
                 page_url = f"{base_url}&page={page}"
-                driver.get(page_url)
-                time.sleep(random.uniform(2.0, 3.5)) # 2-3.5s delay
-                
-                # Check for products
-                try:
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-component-type='s-search-result']"))
-                    )
-                except:
-                    print(f"      ❌ Timeout waiting for items on page {page}. Retrying once...")
-                    driver.refresh()
-                    time.sleep(5)
-                    try:
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-component-type='s-search-result']"))
-                        )
-                    except:
+                if args.replay:
+                    html = cache.get(page_url)
+                    if html is None:
+                        if page <= crawled.get(cat_name, 0):
+                            missing.append((cat_name, page))
+                        print(f"      📼 Page {page} not in the cache. Moving to next category.")
+                        break
+                    html = html.decode("utf-8")
+                else:
+                    html = load_page(driver, page_url, page, pacer)
+                    if html is None:
                         print("      🛑 Still failing. Moving to next category.")
                         break
-
-                # Scroll down
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-                time.sleep(1)
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                
-                # Parse
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                items = soup.select("div[data-component-type='s-search-result']")
-                print(f"      Found {len(items)} items on page.")
-                
-                start_count = len(all_products)
-                
-                for item in items:
-                    try:
-                        # 1. Title
-                        title_el = item.select_one("h2 a span")
-                        link_el = item.select_one("h2 a")
-                        
-                        if not title_el: continue
-                        title = title_el.text.strip()
-                        slug = slugify(title)
-                        
-                        # Get URL
-                        product_url = ""
-                        if link_el and link_el.get("href"):
-                            href = link_el.get("href")
-                            if href.startswith("/"):
-                                product_url = "https://www.amazon.in" + href
-                            else:
-                                product_url = href
-                        
-                        if slug in existing_slugs:
-                            continue # Skip duplicates
-
-                            
-                        # 2. Price
-                        price_el = item.select_one(".a-price-whole")
-                        if not price_el: continue # Skip if no price (unavailable)
-                        price = float(price_el.text.replace(",", "").replace(".", ""))
-                        
-                        # 3. Original Price (MRP)
-                        mrp_el = item.select_one(".a-text-price .a-offscreen")
-                        original_price = None
-                        if mrp_el:
-                            txt = mrp_el.text.replace("₹", "").replace(",", "").strip()
-                            if txt: original_price = float(txt)
-                            
-                        # 4. Image
-                        img_el = item.select_one("img.s-image")
-                        image = img_el.get("src") if img_el else ""
-                        
-                        # 5. Rating
-                        rating = 4.0
-                        rating_el = item.select_one("span.a-icon-alt")
-                        if rating_el:
-                            match = re.search(r"([\d.]+)", rating_el.text)
-                            if match: rating = float(match.group(1))
-
-                        # 6. Reviews
-                        reviews = 0
-                        reviews_el = item.select_one("span.a-size-base.s-underline-text")
-                        if reviews_el:
-                            reviews = int(reviews_el.text.replace(",", "").replace("(", "").replace(")", ""))
-
-                        # Calculate Logic
-                        discount = 0
-                        if original_price and original_price > price:
-                            discount = int(((original_price - price) / original_price) * 100)
-                        
-                        # Add to list
-                        product = {
-                            "title": title,
-                            "slug": slug,
-                            "description": f"Elegant {cat['name']} from Amazon collection. High quality craftsmanship.",
-                            "price": price,
-                            "originalPrice": original_price,
-                            "discountPercentage": discount,
-                            "rating": rating,
-                            "reviewsCount": reviews,
-                            "itemsLeft": random.randint(10, 50),
-                            "image": image,
-                            "images": [image],
-                            "category": cat["name"],
-                            "categorySlug": cat["slug"],
-                            "tags": [cat["slug"], "amazon", "jewelry"],
-                            "isFeatured": False,
-                            "isNew": page == 1, # Mark page 1 items as new
-                            "source": "Amazon.in",
-                            "sourceUrl": product_url
-                        }
-                        
-                        all_products.append(product)
-                        existing_slugs.add(slug)
-                        print(f"      ✓ {title[:40]}... ₹{int(price)}")
-                        
-                    except Exception as e:
-                        # print(f"Error parsing item: {e}")
-                        continue
-                
-                added = len(all_products) - start_count
-                print(f"      ✨ Added {added} new products from this page")
-                
-                # Update progress
-                progress[cat_name] = page
+                    if cache:
+                        cache.put(page_url, html.encode("utf-8"))
                 
-                # Save periodically
-                save_progress(all_products, progress)
+                handle_page(html, cat, page, on_parsed)
                 
                 # Go to next page logic is handled by loop + direct URL get now
                 # Just nice delay
                 # time.sleep(random.uniform(3, 6)) # Already at start of loop
+        complete = True
 
     except KeyboardInterrupt:
         print("\n� Stopping scraper (User Interrupt)")
     except Exception as e:
         print(f"\n❌ Fatal Error: {e}")
     finally:
-        driver.quit()
+        if driver:
+            driver.quit()
+        if pipeline:
+            pipeline.close()  # finish parsing whatever the browser already fetched
+        if writer:
+            writer.close()
+        if journal:
+            journal.close()  # fold the journal into the JSON dump
         print("\n✅ Scraper Finished.")
-        print(f"� Final Count: {len(all_products)} products saved to amazon_large_dump.json")
+        if not args.replay:
+            print(f"⏱️  {pacer.report()}")
+        print(f"� Final Count: {len(existing_slugs)} products saved to {os.path.basename(output_file)} ({len(existing_slugs) - start_total} new)")
+        if args.replay:
+            finish_replay(output_file, live_file, complete, missing)
 
 if __name__ == "__main__":
     main()
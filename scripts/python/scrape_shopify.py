@@ -0,0 +1,210 @@
+"""
+Multi-store Shopify scraper
+Crawls every store in STORES at once on one event loop:
+- each host gets its own token bucket (its polite request rate)
+- a global cap limits requests in flight across all stores
+so adding a store adds its own crawl time in parallel, not in sequence.
+
+--serial keeps the original crawl: one store after another, one page at a
+time with a 1-2s delay. Note that --concurrency is the global cap on
+requests in flight (pages per store is --per-store); it no longer selects
+the serial mode when set to 1.
+
+Usage:
+    source .venv/bin/activate.fish
+    python scrape_shopify.py                       # every store
+    python scrape_shopify.py --store adore         # just one
+    python scrape_shopify.py --concurrency 16 --incremental --ndjson --gzip
+    python scrape_shopify.py --cache               # also keep raw pages in dump/cache
+    python scrape_shopify.py --replay              # re-parse the cached crawl, no network
+    python scrape_shopify.py --serial              # one page at a time, store by store
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import http_client
+from shopify import scrape_shopify_store, scrape_shopify_store_async, load_state, save_state, merge_products, merge_categories
+from dump_io import NDJSONWriter, iter_products, dump_path
+from response_cache import ResponseCache
+
+# Output directory
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DUMP_DIR = os.path.join(BASE_DIR, "dump")
+os.makedirs(DUMP_DIR, exist_ok=True)
+STATE_FILE = os.path.join(DUMP_DIR, "shopify_state.json")
+
+# Stores to scrape
+# rate/burst: polite requests per second for that host
+# max_pages: safety limit (250 products per page)
+STORES = [
+    {"key": "adore", "name": "Adore By Priyanka", "base_url": "https://www.adorebypriyanka.com",
+     "dump": "adore", "max_pages": 20, "rate": 0.75, "burst": 2},
+    {"key": "peora", "name": "Peora Jewelry", "base_url": "https://www.peorajewellery.com",
+     "dump": "peora", "max_pages": 30, "rate": 0.75, "burst": 2},
+]
+
+
+class StoreJob:
+    """Output files, incremental state and streaming writer for one store"""
+
+    def __init__(self, store: dict, args):
+        self.store = store
+        self.categories_file = os.path.join(DUMP_DIR, f"{store['dump']}_categories.json")
+        self.products_file = dump_path(DUMP_DIR, f"{store['dump']}_products", ndjson=args.ndjson, compress=args.gzip)
+        self.streaming = args.ndjson or args.gzip
+
+        # Incremental runs need a previous dump to merge into
+        self.state = None
+        if args.incremental:
+            if os.path.exists(self.products_file):
+                self.state = load_state(STATE_FILE, store["base_url"])
+            else:
+                print(f"ℹ️ {store['name']}: no previous dump found - doing a full crawl first")
+                self.state = {}
+        self.merging = self.state is not None and os.path.exists(self.products_file)
+
+        # Stream pages straight to disk unless we have to merge into the old dump first
+        self.writer = NDJSONWriter(self.products_file) if self.streaming and not self.merging else None
+
+    def save(self, categories: list, products: list):
+        store = self.store
+
+        if self.merging:
+            existing_products = list(iter_products(self.products_file))
+            existing_categories = []
+            if os.path.exists(self.categories_file):
+                with open(self.categories_file, "r", encoding="utf-8") as f:
+                    existing_categories = json.load(f)
+            print(f"\n🔁 {store['name']}: {len(products)} changed products")
+            products, updated, added = merge_products(existing_products, products)
+            categories = merge_categories(existing_categories, categories)
+            print(f"   ✏️  {updated} updated, ✨ {added} new")
+
+        product_count = self.writer.count if self.writer else len(products)
+        print(f"\n✅ {store['name']}: scraped {product_count} products in {len(categories)} categories")
+
+        # Show category breakdown
+        print("\n📊 Categories:")
+        cat_counts = {}
+        for p in (iter_products(self.products_file) if self.writer else products):
+            cat = p["categorySlug"]
+            cat_counts[cat] = cat_counts.get(cat, 0) + 1
+        for cat, count in sorted(cat_counts.items(), key=lambda x: -x[1]):
+            print(f"   {cat}: {count}")
+
+        # Save categories
+        with open(self.categories_file, "w", encoding="utf-8") as f:
+            json.dump(categories, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 Saved categories to {self.categories_file}")
+
+        # Save products (already on disk when streamed)
+        if not self.writer:
+            if self.streaming:
+                with NDJSONWriter(self.products_file) as out:
+                    out.write_many(products)
+            else:
+                with open(self.products_file, "w", encoding="utf-8") as f:
+                    json.dump(products, f, indent=2, ensure_ascii=False)
+        print(f"📁 Saved products to {self.products_file}")
+
+        if self.state is not None:
+            save_state(STATE_FILE, store["base_url"], self.state)
+            print(f"📁 Saved incremental state to {STATE_FILE}")
+
+
+async def crawl(jobs: list, concurrency: int, per_store: int):
+    """Run every store's crawl concurrently on one shared pooled session"""
+    limiter = http_client.HostRateLimiter()
+    for job in jobs:
+        limiter.set_rate(job.store["base_url"], job.store.get("rate", 1.0), job.store.get("burst", 1))
+    gate = asyncio.Semaphore(concurrency)
+
+    async with http_client.async_session(concurrency, limit_per_host=per_store) as session:
+        tasks = [
+            scrape_shopify_store_async(
+                job.store["base_url"], job.store["name"], session, limiter, gate,
+                max_pages=job.store.get("max_pages", 20), concurrency=per_store,
+                state=job.state, sink=job.writer.write_many if job.writer else None,
+            )
+            for job in jobs
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def crawl_serial(jobs: list) -> list:
+    """The original one-page-at-a-time crawl, store by store"""
+    results = []
+    for job in jobs:
+        try:
+            results.append(scrape_shopify_store(
+                job.store["base_url"], job.store["name"], max_pages=job.store.get("max_pages", 20),
+                state=job.state, sink=job.writer.write_many if job.writer else None,
+            ))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", action="append", choices=[s["key"] for s in STORES],
+                        help="Store to scrape (repeatable, default: all)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Global cap on requests in flight across all stores")
+    parser.add_argument("--per-store", type=int, default=2,
+                        help="Pages in flight per store (its token bucket still sets the pace)")
+    parser.add_argument("--serial", action="store_true",
+                        help="Fetch one page at a time (1-2s apart), one store after another")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch products changed since the last run and merge them into the dump")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream products to NDJSON (one per line) as each page is parsed")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Like --ndjson but gzip-compressed (.ndjson.gz)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Store every raw page in the content-addressed cache (dump/cache)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Parse the latest cached pages instead of fetching (no network)")
+    args = parser.parse_args(argv)
+    if args.replay and args.incremental:
+        parser.error("--replay re-parses a recorded full crawl; it can't be combined with --incremental")
+
+    if args.cache or args.replay:
+        http_client.use_cache(ResponseCache(), replay=args.replay)
+        if args.replay:
+            print("📼 Replay mode: reading pages from the response cache")
+
+    stores = [s for s in STORES if not args.store or s["key"] in args.store]
+    print(f"🚀 Starting Shopify Scraper: {', '.join(s['name'] for s in stores)}")
+    print("=" * 50)
+
+    jobs = [StoreJob(store, args) for store in stores]
+    started = time.monotonic()
+    try:
+        if args.serial:
+            results = crawl_serial(jobs)
+        else:
+            results = asyncio.run(crawl(jobs, args.concurrency, args.per_store))
+    finally:
+        for job in jobs:
+            if job.writer:
+                job.writer.close()
+    print(f"\n⏱️  Crawled {len(jobs)} store(s) in {time.monotonic() - started:.1f}s")
+
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print(f"\n❌ {job.store['name']} failed: {result}")
+            continue
+        categories, products = result
+        job.save(categories, products)
+
+    print(f"\n🎉 Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Shared Shopify JSON API scraper used by scrape_adore.py and scrape_peora.py
+Most Shopify stores expose /products.json?limit=250&page=N
+
+Two fetch modes:
+- serial (scrape_shopify.py --serial): one page at a time with a polite 1-2s delay
+- async (default): pages of many stores in flight at once on one event loop (aiohttp)
+
+All requests go through http_client, so pages reuse warm pooled connections
+and can be recorded to / replayed from the raw response cache.
+
+Both modes return the same (categories, products) tuple in page order.
+Either mode can run incrementally (only products changed since the last
+run, via updated_at_min + ETag/If-None-Match) and merge into the old dump.
+"""
+
+import asyncio
+import json
+import os
+import time
+import random
+import re
+from contextlib import nullcontext
+from datetime import datetime
+from urllib.parse import quote
+
+import http_client
+from slugs import slugify
+
+PAGE_SIZE = 250
+
+def page_url(base_url: str, page: int, since: str = None) -> str:
+    url = f"{base_url}/products.json?limit={PAGE_SIZE}&page={page}"
+    if since:
+        url += f"&updated_at_min={quote(since)}"
+    return url
+
+def is_newer(updated_at: str, since: str) -> bool:
+    """True if a Shopify updated_at timestamp is at/after the high-water mark"""
+    if not updated_at:
+        return True  # Can't tell - keep it
+    try:
+        return datetime.fromisoformat(updated_at) >= datetime.fromisoformat(since)
+    except ValueError:
+        return True
+
+def parse_product(p: dict, store_name: str, categories: dict) -> dict:
+    """Turn one raw Shopify product into our dump format (registers its category)"""
+    title = p.get("title", "Product")
+    slug = p.get("handle", slugify(title))
+
+    # Get category from product type or tags
+    product_type = p.get("product_type", "Jewelry")
+    if product_type:
+        cat_slug = slugify(product_type)
+        if cat_slug not in categories:
+            categories[cat_slug] = {
+                "name": product_type.title(),
+                "slug": cat_slug,
+                "description": f"Beautiful {product_type.lower()} collection"
+            }
+    else:
+        cat_slug = "jewelry"
+        if cat_slug not in categories:
+            categories[cat_slug] = {
+                "name": "Jewelry",
+                "slug": cat_slug,
+                "description": "Beautiful jewelry collection"
+            }
+
+    # Get first variant price
+    variants = p.get("variants", [])
+    price = 999
+    original_price = None
+    if variants:
+        try:
+            price = int(float(variants[0].get("price", "999")))
+            compare_price = variants[0].get("compare_at_price")
+            if compare_price:
+                original_price = int(float(compare_price))
+        except:
+            pass
+
+    # Calculate discount
+    discount = None
+    if original_price and original_price > price:
+        discount = round((1 - price / original_price) * 100)
+
+    # Get first image
+    images = p.get("images", [])
+    image = images[0].get("src", "") if images else ""
+    all_images = [img.get("src", "") for img in images[:4]]
+
+    if not image:
+        image = f"https://picsum.photos/seed/{slug}/400/400"
+        all_images = [image]
+
+    # Description (strip HTML)
+    desc = p.get("body_html", "")
+    desc = re.sub(r'<[^>]+>', '', desc)  # Remove HTML tags
+    desc = desc[:300] if desc else f"Beautiful {product_type.lower()} from {store_name}."
+
+    return {
+        "title": title[:100],
+        "slug": slug,
+        "description": desc,
+        "price": price,
+        "originalPrice": original_price,
+        "discountPercentage": discount,
+        "rating": round(random.uniform(4.2, 4.9), 1),
+        "reviewsCount": random.randint(5, 120),
+        "itemsLeft": random.randint(10, 50),
+        "image": image,
+        "images": all_images,
+        "category": categories[cat_slug]["name"],
+        "categorySlug": cat_slug,
+        "tags": p.get("tags", [])[:5] if p.get("tags") else [cat_slug, "jewelry"],
+        "isFeatured": random.random() > 0.85,
+        "isNew": random.random() > 0.9,
+        "vendor": p.get("vendor", store_name),
+    }
+
+def parse_page(raw_products: list, store_name: str, categories: dict) -> list:
+    """Parse one raw product page, registering new categories as it goes"""
+    products = []
+    for p in raw_products:
+        try:
+            products.append(parse_product(p, store_name, categories))
+        except Exception as e:
+            print(f"   ⚠ Error parsing product: {e}")
+            continue
+    return products
+
+
+def _read_page(page: int, url: str, status: int, etag: str, data: dict, etags: dict, since: str, label: str = ""):
+    """
+    Shared page handling for both fetch modes.
+
+    Returns the page's (changed) products, [] for an unchanged page, or None
+    when the catalog ends here. Errors raise so callers can tell them apart
+    from a clean end of catalog.
+    """
+    if status == 304:
+        print(f"   {label}Page {page} unchanged (ETag)")
+        return []
+
+    if status != 200:
+        raise RuntimeError(f"Status {status} on page {page}")
+
+    products = data.get("products", [])
+    if not products:
+        print(f"   {label}No more products (page {page})")
+        return None
+
+    if etags is not None and etag:
+        etags[url] = etag
+
+    # Not every storefront honours updated_at_min, so filter here as well
+    if since:
+        products = [p for p in products if is_newer(p.get("updated_at"), since)]
+
+    print(f"   {label}Found {len(products)} products on page {page}")
+    return products
+
+
+def fetch_pages_serial(base_url: str, max_pages: int, on_page, since: str = None, etags: dict = None) -> bool:
+    """Fetch raw product pages one at a time, stopping at the first empty page
+
+    Each page's raw products are handed to on_page() in page order.
+    Returns False if a request failed (crawl incomplete).
+    """
+    page = 1
+    complete = True
+
+    while page <= max_pages:
+        url = page_url(base_url, page, since)
+        print(f"   Fetching page {page}...")
+
+        try:
+            headers = {"If-None-Match": etags[url]} if etags and url in etags else None
+            status, response_headers, body = http_client.fetch(url, headers=headers)
+            data = json.loads(body) if status == 200 else None
+
+            products = _read_page(page, url, status, response_headers.get("ETag"), data, etags, since)
+            if products is None:
+                break
+            on_page(products)
+
+            page += 1
+            if not http_client.replaying():
+                time.sleep(random.uniform(1, 2))  # Rate limiting
+
+        except Exception as e:
+            print(f"   ❌ Error: {e} - stopping")
+            complete = False
+            break
+
+    return complete
+
+
+async def fetch_pages_async(base_url: str, max_pages: int, concurrency: int, on_page, since: str = None, etags: dict = None,
+                            session=None, limiter=None, gate=None, label: str = "") -> bool:
+    """
+    Fetch raw product pages with up to `concurrency` requests in flight.
+
+    Pages are scheduled in order as slots free up. The first empty page (or
+    non-200 / error) marks the end of the catalog: nothing past it is
+    scheduled and any pages after it that were already in flight are dropped.
+
+    Finished pages are handed to on_page() as soon as every page before them
+    has been, so they are never held longer than needed. Returns False if a
+    request failed, like fetch_pages_serial.
+
+    When several stores share one event loop (scrape_shopify.py) pass the
+    shared `session`, a http_client.HostRateLimiter as `limiter` and a global
+    asyncio.Semaphore as `gate`.
+    """
+    results = {}
+    next_emit = 1
+    failed = set()
+    stop_at = max_pages + 1  # first page number that is NOT part of the catalog
+
+    async def fetch(session, page):
+        url = page_url(base_url, page, since)
+        headers = {"If-None-Match": etags[url]} if etags and url in etags else None
+        try:
+            async with gate or nullcontext():
+                if limiter and not http_client.replaying():
+                    await limiter.acquire(url)
+                print(f"   {label}Fetching page {page}...")
+                status, response_headers, body = await http_client.fetch_async(session, url, headers)
+                data = json.loads(body) if status == 200 else None
+                return page, _read_page(page, url, status, response_headers.get("ETag"), data, etags, since, label)
+        except Exception as e:
+            print(f"   ❌ {label}Error on page {page}: {e} - stopping")
+            failed.add(page)
+            return page, None
+
+    async with (nullcontext(session) if session else http_client.async_session(concurrency)) as session:
+        in_flight = {}  # task -> page number
+        next_page = 1
+
+        while True:
+            while len(in_flight) < concurrency and next_page < stop_at:
+                in_flight[asyncio.create_task(fetch(session, next_page))] = next_page
+                next_page += 1
+
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                del in_flight[task]
+                page, products = task.result()
+                if products is None:
+                    stop_at = min(stop_at, page)
+                else:
+                    results[page] = products
+
+            while next_emit in results:
+                on_page(results.pop(next_emit))
+                next_emit += 1
+
+            # Anything past the end is wasted work - don't wait on it
+            for task, page in list(in_flight.items()):
+                if page >= stop_at:
+                    task.cancel()
+                    del in_flight[task]
+
+    # Pages left in `results` sit behind a gap (failed page) and are dropped
+    return not any(page <= stop_at for page in failed)
+
+
+def _store_run(store_name: str, state: dict, sink):
+    """
+    Per-store bookkeeping shared by the sync and async entry points.
+    Returns (since, etags, on_page, finish).
+    """
+    since = state.get("updated_at") if state else None
+    etags = dict(state.get("etags", {})) if state is not None else None
+    if since:
+        print(f"   🔁 Incremental mode: changes since {since}")
+
+    categories = {}
+    all_products = []
+    high_water = since
+
+    def on_page(raw_products):
+        nonlocal high_water
+        for p in raw_products:
+            updated_at = p.get("updated_at")
+            if updated_at and (not high_water or is_newer(updated_at, high_water)):
+                high_water = updated_at
+
+        products = parse_page(raw_products, store_name, categories)
+        if sink:
+            sink(products)
+        else:
+            all_products.extend(products)
+
+    def finish(complete: bool):
+        # Only move the high-water mark after a clean crawl - products on pages
+        # we never got would otherwise be skipped forever
+        if state is not None and not complete:
+            print(f"   ⚠ {store_name}: crawl incomplete - keeping the previous high-water mark")
+        elif state is not None:
+            # ETags belong to the exact URLs (updated_at_min included) - once the
+            # mark moves on, next run asks for different URLs
+            state["etags"] = etags if high_water == since else {}
+            state["updated_at"] = high_water
+
+        return list(categories.values()), all_products
+
+    return since, etags, on_page, finish
+
+
+def scrape_shopify_store(base_url: str, store_name: str, max_pages: int = 20, state: dict = None, sink=None):
+    """Scrape products using Shopify's JSON API, one page at a time
+
+    Pass `state` (see load_state) for an incremental run: only products updated
+    since state["updated_at"] are requested (updated_at_min + If-None-Match),
+    and `state` is updated in place with the new high-water mark and ETags.
+
+    Pass `sink` (e.g. NDJSONWriter.write_many) to stream each parsed page out
+    instead of collecting it; the returned product list is then empty.
+    """
+    print(f"🌐 Scraping {store_name}...")
+    since, etags, on_page, finish = _store_run(store_name, state, sink)
+
+    complete = fetch_pages_serial(base_url, max_pages, on_page, since, etags)
+    return finish(complete)
+
+
+async def scrape_shopify_store_async(base_url: str, store_name: str, session, limiter, gate,
+                                     max_pages: int = 20, concurrency: int = 2, state: dict = None, sink=None):
+    """
+    Coroutine version of scrape_shopify_store for crawling many stores on one
+    event loop. Pacing comes from `limiter` (per-host token buckets) and `gate`
+    (global cap on requests in flight) instead of sleeps.
+    """
+    print(f"🌐 Scraping {store_name}...")
+    since, etags, on_page, finish = _store_run(store_name, state, sink)
+    label = f"[{store_name}] "
+    complete = await fetch_pages_async(base_url, max_pages, concurrency, on_page, since, etags,
+                                       session=session, limiter=limiter, gate=gate, label=label)
+    return finish(complete)
+
+
+# --- Incremental mode helpers ---
+
+# Synthetic fields we generate ourselves - keep them stable across refreshes
+STABLE_FIELDS = ["rating", "reviewsCount", "itemsLeft", "isFeatured", "isNew"]
+
+def load_state(state_file: str, base_url: str) -> dict:
+    """Per-store incremental state: {"updated_at": ..., "etags": {url: etag}}"""
+    if os.path.exists(state_file):
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                return json.load(f).get(base_url, {})
+        except Exception as e:
+            print(f"   ⚠ Could not read {state_file}: {e}")
+    return {}
+
+def save_state(state_file: str, base_url: str, state: dict):
+    all_states = {}
+    if os.path.exists(state_file):
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                all_states = json.load(f)
+        except Exception:
+            pass
+    all_states[base_url] = state
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(all_states, f, indent=2)
+    os.replace(temp_file, state_file)
+
+def merge_products(existing: list, changed: list):
+    """Merge changed products into the existing dump by slug (order preserved)"""
+    index = {p["slug"]: i for i, p in enumerate(existing)}
+    merged = list(existing)
+    updated = added = 0
+
+    for p in changed:
+        i = index.get(p["slug"])
+        if i is None:
+            index[p["slug"]] = len(merged)
+            merged.append(p)
+            added += 1
+        else:
+            for field in STABLE_FIELDS:
+                if field in merged[i]:
+                    p[field] = merged[i][field]
+            merged[i] = p
+            updated += 1
+
+    return merged, updated, added
+
+def merge_categories(existing: list, changed: list) -> list:
+    known = {c["slug"] for c in existing}
+    return existing + [c for c in changed if c["slug"] not in known]
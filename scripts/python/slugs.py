@@ -0,0 +1,108 @@
+"""
+Product slugs: one slugify/truncation for every scraper and importer, plus
+the unique slug allocation every importer goes through
+
+A colliding slug gets "<first 50 chars>-<n>". Instead of probing -1, -2, ...
+against every slug, allocate_slugs() renames the colliding rows of a
+staging table in one statement, numbering on from the highest n per prefix
+(an index range scan per colliding prefix). Hold lock_slugs() for the transaction that inserts the
+slugs: concurrent importers then queue up instead of handing out the same
+suffix.
+
+Usage:
+    lock_slugs(cursor)
+    allocate_slugs(cursor, "staging", "EXISTS (SELECT 1 FROM \"Product\" p WHERE p.slug = s.slug)")
+    ... INSERT INTO "Product" ... SELECT ... FROM staging; commit
+"""
+
+import re
+
+SLUG_LENGTH = 60
+PREFIX_LENGTH = 50  # leaves room for "-<n>" within SLUG_LENGTH
+LOCK_KEY = "product-slugs"
+
+
+def slugify(text: str) -> str:
+    """Convert text to URL-friendly slug"""
+    text = text.lower().strip()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[\s_-]+', '-', text)
+    return text[:SLUG_LENGTH]
+
+
+def truncate_slug(slug: str) -> str:
+    """Slugs as stored in the DB (scraped handles can be longer)"""
+    return slug[:SLUG_LENGTH]
+
+
+def suffix_counters_sql(slugs_query: str) -> str:
+    """(prefix, highest suffix) for every "<prefix>-<n>" slug returned by slugs_query"""
+    return rf'''
+        SELECT substring(slug from '^(.*)-\d{{1,9}}$') AS prefix,
+               MAX(substring(slug from '-(\d{{1,9}})$')::int) AS counter
+        FROM ({slugs_query}) AS slugs
+        WHERE slug ~ '-\d{{1,9}}$' AND length(substring(slug from '^(.*)-\d{{1,9}}$')) <= {PREFIX_LENGTH}
+        GROUP BY prefix
+    '''
+
+
+def lock_slugs(cursor, session: bool = False):
+    """
+    Advisory lock around slug allocation + insert. Transaction-scoped by
+    default (released on commit/rollback); session=True holds it until
+    unlock_slugs(), for work spread over several transactions.
+    """
+    function = "pg_advisory_lock" if session else "pg_advisory_xact_lock"
+    cursor.execute(f"SELECT {function}(hashtext(%s))", (LOCK_KEY,))
+
+
+def unlock_slugs(cursor):
+    cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_KEY,))
+
+
+def _byte_ordered(cursor) -> bool:
+    """Whether the DB sorts text bytewise (then "<prefix>-" <= slug < "<prefix>." means slug starts "<prefix>-")"""
+    cursor.execute("SELECT datcollate FROM pg_database WHERE datname = current_database()")
+    collation = cursor.fetchone()[0]
+    return collation in ("C", "POSIX") or collation.startswith("C.")
+
+
+def allocate_slugs(cursor, staging: str, where: str, column: str = "slug", order: str = "id") -> int:
+    """
+    Set `column` to the next free "<prefix>-<n>" on the rows of `staging`
+    (aliased s) matching `where`. n continues from the highest suffix in use
+    in "Product" and in `staging`, so nothing handed out can collide. Hold
+    lock_slugs() until the rows are inserted. Returns the rows renamed.
+
+    Only the colliding prefixes are looked up in "Product", each with a range
+    scan of the slug index, so the cost follows the batch, not the catalog.
+    On a DB whose collation isn't bytewise that range can't be used, and the
+    whole catalog's suffixes are counted instead.
+    """
+    if _byte_ordered(cursor):
+        catalog = r'''
+            SELECT x.prefix, (
+                SELECT MAX(substring(p.slug from length(x.prefix) + 2)::int) FROM "Product" p
+                WHERE p.slug >= x.prefix || '-' AND p.slug < x.prefix || '.'
+                  AND substring(p.slug from length(x.prefix) + 2) ~ '^\d{1,9}$'
+            ) AS counter
+            FROM (SELECT DISTINCT prefix FROM ranked) x
+        '''
+    else:
+        catalog = suffix_counters_sql('SELECT slug FROM "Product"')
+    cursor.execute(f'''
+        WITH ranked AS (
+            SELECT s.ctid AS row, left(s.slug, {PREFIX_LENGTH}) AS prefix,
+                   row_number() OVER (PARTITION BY left(s.slug, {PREFIX_LENGTH}) ORDER BY s.{order}) AS rn
+            FROM {staging} s WHERE {where}
+        ),
+        catalog AS ({catalog}),
+        staged AS ({suffix_counters_sql(f"SELECT slug FROM {staging}")})
+        UPDATE {staging} s
+        SET {column} = r.prefix || '-' || (GREATEST(c.counter, t.counter, 0) + r.rn)
+        FROM ranked r
+        LEFT JOIN catalog c ON c.prefix = r.prefix
+        LEFT JOIN staged t ON t.prefix = r.prefix
+        WHERE s.ctid = r.row
+    ''')
+    return cursor.rowcount
@@ -0,0 +1,254 @@
+"""
+Zero-downtime full reloads: build the new table on the side, then swap it in
+
+The live table keeps serving while the shadow copy (same columns and
+defaults, row level security switched on like the live table's, no indexes
+yet) is bulk-loaded. Indexes are built once afterwards instead of being
+maintained row by row, and if anything fails up to that point the live
+table is untouched. swap() is one short transaction: copy the grants, RLS
+policies, triggers and publication membership, drop the old table, rename
+the shadow and its indexes to the real names, and re-point foreign keys
+(added NOT VALID, then validated once readers are back on the new table).
+
+Rows in other tables (Review, CartItem...) that reference rows missing from
+the new table get the same treatment DELETE would give them: ON DELETE
+CASCADE rows are deleted, SET NULL columns are cleared, and anything else
+aborts the swap. Load the shadow with the live ids of the rows it keeps,
+and call check_references() right after loading to fail before the index
+builds rather than in swap(). If the load is incomplete (a batch or a
+partition failed), drop_shadow() instead of swapping: every row it misses
+would take its cascading Reviews, CartItems... with it.
+
+Usage:
+    shadow = create_shadow(cursor, "Product")
+    ... COPY into shadow, keeping live ids ...   # on failure: drop_shadow(cursor, shadow)
+    check_references(cursor, "Product", shadow)
+    build_indexes(cursor, "Product", shadow)
+    constraints = swap(cursor, "Product", shadow)
+    connection.commit()
+    validate(cursor, constraints)
+"""
+
+import re
+
+SHADOW_SUFFIX = "_shadow"
+LOCK_TIMEOUT = "5s"  # give up rather than queue the storefront behind a long query
+
+_INDEX_DEF_RE = re.compile(r"^(CREATE (?:UNIQUE )?INDEX )(\S+)( ON )(\S+)( .*)$")
+_TRIGGER_DEF_RE = re.compile(r"^(CREATE (?:CONSTRAINT )?TRIGGER \S+ .*? ON )(\S+)( .*)$")
+_TRIGGER_STATE = {"D": "DISABLE TRIGGER", "R": "ENABLE REPLICA TRIGGER", "A": "ENABLE ALWAYS TRIGGER"}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _copy_row_security(cursor, table: str, shadow: str):
+    cursor.execute("SELECT relrowsecurity, relforcerowsecurity FROM pg_class WHERE oid = %s::regclass",
+                   (_quote(table),))
+    enabled, forced = cursor.fetchone()
+    if enabled:
+        cursor.execute(f"ALTER TABLE {_quote(shadow)} ENABLE ROW LEVEL SECURITY")
+    if forced:
+        cursor.execute(f"ALTER TABLE {_quote(shadow)} FORCE ROW LEVEL SECURITY")
+
+
+def create_shadow(cursor, table: str) -> str:
+    """
+    Empty copy of `table` (columns and defaults; RLS on if the live table has
+    it, so default grants don't expose it while it loads); returns its name
+    """
+    shadow = table + SHADOW_SUFFIX
+    cursor.execute(f"DROP TABLE IF EXISTS {_quote(shadow)}")
+    cursor.execute(f"CREATE TABLE {_quote(shadow)} (LIKE {_quote(table)} INCLUDING DEFAULTS)")
+    _copy_row_security(cursor, table, shadow)
+    return shadow
+
+
+def drop_shadow(cursor, shadow: str):
+    """Throw away a shadow table whose load failed; the live table never saw it"""
+    cursor.execute(f"DROP TABLE IF EXISTS {_quote(shadow)}")
+
+
+def _indexes(cursor, table: str) -> list:
+    """(index name, definition, constraint kind: "PRIMARY KEY", "UNIQUE" or None)"""
+    cursor.execute('''
+        SELECT ci.relname, pg_get_indexdef(i.indexrelid),
+               CASE c.contype WHEN 'p' THEN 'PRIMARY KEY' WHEN 'u' THEN 'UNIQUE' END
+        FROM pg_index i
+        JOIN pg_class ci ON ci.oid = i.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = i.indexrelid AND c.contype IN ('p', 'u')
+        WHERE i.indrelid = %s::regclass
+    ''', (_quote(table),))
+    return cursor.fetchall()
+
+
+def build_indexes(cursor, table: str, shadow: str):
+    """Recreate the live table's indexes and primary/unique keys on the loaded shadow"""
+    for name, definition, constraint in _indexes(cursor, table):
+        match = _INDEX_DEF_RE.match(definition)
+        shadow_name = name + SHADOW_SUFFIX
+        cursor.execute(match.group(1) + _quote(shadow_name) + match.group(3) + _quote(shadow) + match.group(5))
+        if constraint:
+            # the constraint takes over the index (and its name)
+            cursor.execute(f"ALTER TABLE {_quote(shadow)} ADD CONSTRAINT {_quote(shadow_name)} "
+                           f"{constraint} USING INDEX {_quote(shadow_name)}")
+        print(f"   🗂️  Built {name}")
+
+
+def _outgoing_constraints(cursor, table: str) -> list:
+    """Foreign keys and checks on `table` itself: (name, definition)"""
+    cursor.execute('''
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('f', 'c')
+    ''', (_quote(table),))
+    return cursor.fetchall()
+
+
+def _incoming_foreign_keys(cursor, table: str) -> list:
+    """Foreign keys pointing at `table`: (table, name, definition, column, referenced column, on delete)"""
+    cursor.execute('''
+        SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid),
+               a.attname, af.attname, c.confdeltype
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        JOIN pg_attribute af ON af.attrelid = c.confrelid AND af.attnum = c.confkey[1]
+        WHERE c.confrelid = %s::regclass AND c.contype = 'f' AND c.conrelid <> c.confrelid
+    ''', (_quote(table),))
+    return cursor.fetchall()
+
+
+def _grants(cursor, table: str) -> list:
+    """Privileges other roles hold on `table` (Supabase's anon/authenticated...)"""
+    cursor.execute('''
+        SELECT a.privilege_type, CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END
+        FROM pg_class c, aclexplode(c.relacl) a
+        WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+    ''', (_quote(table),))
+    return cursor.fetchall()
+
+
+def _policies(cursor, table: str) -> list:
+    """RLS policies on `table`: (name, CREATE POLICY clauses after "ON <table>")"""
+    cursor.execute('''
+        SELECT polname,
+               CASE WHEN polpermissive THEN 'PERMISSIVE' ELSE 'RESTRICTIVE' END,
+               CASE polcmd WHEN 'r' THEN 'SELECT' WHEN 'a' THEN 'INSERT' WHEN 'w' THEN 'UPDATE'
+                           WHEN 'd' THEN 'DELETE' ELSE 'ALL' END,
+               ARRAY(SELECT CASE WHEN r = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(r)) END
+                     FROM unnest(polroles) r),
+               pg_get_expr(polqual, polrelid), pg_get_expr(polwithcheck, polrelid)
+        FROM pg_policy WHERE polrelid = %s::regclass
+    ''', (_quote(table),))
+    policies = []
+    for name, kind, command, roles, using, check in cursor.fetchall():
+        clauses = f"AS {kind} FOR {command} TO {', '.join(roles)}"
+        if using:
+            clauses += f" USING ({using})"
+        if check:
+            clauses += f" WITH CHECK ({check})"
+        policies.append((name, clauses))
+    return policies
+
+
+def _triggers(cursor, table: str) -> list:
+    """User triggers on `table`: (name, definition, enabled state)"""
+    cursor.execute('''
+        SELECT tgname, pg_get_triggerdef(oid), tgenabled
+        FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal
+    ''', (_quote(table),))
+    return cursor.fetchall()
+
+
+def _publications(cursor, table: str) -> list:
+    """Publications `table` was added to by name (FOR ALL TABLES ones pick the new table up anyway)"""
+    cursor.execute('''
+        SELECT quote_ident(p.pubname) FROM pg_publication_rel r JOIN pg_publication p ON p.oid = r.prpubid
+        WHERE r.prrelid = %s::regclass
+    ''', (_quote(table),))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _orphans(ref_table: str, column: str, ref_column: str, shadow: str) -> str:
+    """FROM clause: rows of ref_table pointing at values the shadow doesn't have"""
+    return f'''
+        {ref_table} r WHERE r.{_quote(column)} IS NOT NULL AND NOT EXISTS
+        (SELECT 1 FROM {_quote(shadow)} s WHERE s.{_quote(ref_column)} = r.{_quote(column)})
+    '''
+
+
+def check_references(cursor, table: str, shadow: str):
+    """Raise now if swap() would abort: rows elsewhere that can't lose their referenced row"""
+    for ref_table, name, _, column, ref_column, on_delete in _incoming_foreign_keys(cursor, table):
+        if on_delete in ("c", "n"):
+            continue
+        cursor.execute(f"SELECT COUNT(*) FROM {_orphans(ref_table, column, ref_column, shadow)}")
+        count = cursor.fetchone()[0]
+        if count:
+            raise RuntimeError(f"{count} {ref_table} rows reference {table} rows missing from the new "
+                               f"{table} ({name})")
+
+
+def swap(cursor, table: str, shadow: str) -> list:
+    """
+    Replace `table` with `shadow` in the current transaction; commit right
+    after. Returns the (table, constraint) pairs to pass to validate().
+    """
+    cursor.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    cursor.execute(f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE")
+    indexes = _indexes(cursor, table)
+    outgoing = _outgoing_constraints(cursor, table)
+    incoming = _incoming_foreign_keys(cursor, table)
+    for privilege, grantee in _grants(cursor, table):
+        cursor.execute(f"GRANT {privilege} ON {_quote(shadow)} TO {grantee}")
+    _copy_row_security(cursor, table, shadow)
+    for name, clauses in _policies(cursor, table):
+        cursor.execute(f"CREATE POLICY {_quote(name)} ON {_quote(shadow)} {clauses}")
+    for name, definition, enabled in _triggers(cursor, table):
+        match = _TRIGGER_DEF_RE.match(definition)
+        cursor.execute(match.group(1) + _quote(shadow) + match.group(3))
+        if enabled in _TRIGGER_STATE:
+            cursor.execute(f"ALTER TABLE {_quote(shadow)} {_TRIGGER_STATE[enabled]} {_quote(name)}")
+    for publication in _publications(cursor, table):
+        cursor.execute(f"ALTER PUBLICATION {publication} ADD TABLE {_quote(shadow)}")
+
+    # Rows elsewhere that point at rows the new table doesn't have
+    for ref_table, name, _, column, ref_column, on_delete in incoming:
+        orphans = _orphans(ref_table, column, ref_column, shadow)
+        if on_delete == "c":
+            cursor.execute(f"DELETE FROM {orphans}")
+        elif on_delete == "n":
+            cursor.execute(f"UPDATE {ref_table} SET {_quote(column)} = NULL WHERE ctid IN (SELECT r.ctid FROM {orphans})")
+        else:
+            cursor.execute(f"SELECT COUNT(*) FROM {orphans}")
+            if cursor.fetchone()[0]:
+                raise RuntimeError(f"{ref_table} still references rows missing from the new {table} ({name})")
+            continue
+        if cursor.rowcount:
+            print(f"   🧹 {ref_table}: {cursor.rowcount} rows pointed at removed {table} rows")
+
+    for ref_table, name, *_ in incoming:
+        cursor.execute(f"ALTER TABLE {ref_table} DROP CONSTRAINT {_quote(name)}")
+    cursor.execute(f"DROP TABLE {_quote(table)}")
+    cursor.execute(f"ALTER TABLE {_quote(shadow)} RENAME TO {_quote(table)}")
+
+    for name, _, constraint in indexes:
+        if constraint:
+            cursor.execute(f"ALTER TABLE {_quote(table)} RENAME CONSTRAINT {_quote(name + SHADOW_SUFFIX)} TO {_quote(name)}")
+        else:
+            cursor.execute(f"ALTER INDEX {_quote(name + SHADOW_SUFFIX)} RENAME TO {_quote(name)}")
+
+    to_validate = []
+    for name, definition in outgoing:
+        cursor.execute(f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition} NOT VALID")
+        to_validate.append((_quote(table), name))
+    for ref_table, name, definition, *_ in incoming:
+        cursor.execute(f"ALTER TABLE {ref_table} ADD CONSTRAINT {_quote(name)} {definition} NOT VALID")
+        to_validate.append((ref_table, name))
+    return to_validate
+
+
+def validate(cursor, constraints: list):
+    """Check existing rows against the re-added constraints (readers aren't blocked)"""
+    for table, name in constraints:
+        cursor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {_quote(name)}")
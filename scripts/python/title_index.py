@@ -0,0 +1,207 @@
+"""
+MinHash/LSH index of product titles for near-duplicate detection
+
+Titles are normalized to a set of word tokens, reduced to a MinHash
+signature (NUM_PERM multiply-shift hashes) and bucketed by LSH bands, so a
+lookup only compares against titles that share a band - not the whole
+catalog. With 16 bands of 4 rows, pairs above ~0.5 Jaccard become
+candidates; query() keeps those whose estimated similarity >= threshold.
+
+The DB-backed index is cached in dump/title_index.npz, keyed on product
+ids, with an updatedAt watermark: later runs drop the ids that are gone from
+the DB and re-read only the products inserted or updated since (a changed
+title replaces the old entry, it isn't added next to it).
+
+Usage:
+    index = TitleIndex()
+    index.add("peora-ring-1", "Peora Gold Plated Ring for Women", 499)
+    index.query("Gold-Plated Peora Ring For Women")   # [(key, similarity, price)]
+    index.query(title, exclude_id=product_id)          # not the product's own entry
+
+    index = TitleIndex.from_db(connection)             # cached + incremental
+    index.remove(product_id)
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+
+from bulk_load import copy_rows
+
+from pathlib import Path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+INDEX_FILE = os.path.join(BASE_DIR, "dump", "title_index.npz")
+
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.7
+
+STOPWORDS = {"a", "an", "and", "the", "for", "of", "with", "in", "by", "to", "&"}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_rng = np.random.default_rng(20240521)  # fixed: signatures must stay comparable across runs
+_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def title_tokens(title: str) -> set:
+    """Lowercase word set without stopwords and plural 's' (Rings == ring)"""
+    tokens = set()
+    for token in _TOKEN_RE.findall(title.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return tokens
+
+
+def minhash(title: str) -> np.ndarray:
+    tokens = title_tokens(title) or {title.lower()}
+    x = np.array([zlib.crc32(t.encode("utf-8")) for t in tokens], dtype=np.uint64)
+    # Multiply-shift hashing: (a*x + b) mod 2^64, top 32 bits, one column per permutation
+    hashed = (x[:, None] * _A + _B) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+class TitleIndex:
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        self.keys = []
+        self.ids = []
+        self.prices = []
+        self.signatures = []
+        self.buckets = {}   # (band, band bytes) -> [row ids]
+        self.rows_by_id = {}
+        self.removed = set()  # rows left in the buckets until the next save
+        self.watermark = None
+
+    def __len__(self):
+        return len(self.keys) - len(self.removed)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(BANDS):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _insert(self, key, price, signature, product_id=None):
+        if product_id is not None:
+            self.remove(product_id)
+            self.rows_by_id[product_id] = len(self.keys)
+        row = len(self.keys)
+        self.keys.append(key)
+        self.ids.append(product_id)
+        self.prices.append(price)
+        self.signatures.append(signature)
+        for bucket in self._bands(signature):
+            self.buckets.setdefault(bucket, []).append(row)
+
+    def add(self, key: str, title: str, price: float = None, product_id: str = None):
+        """Index a title; adding a product_id again replaces its entry"""
+        self._insert(key, price, minhash(title), product_id)
+
+    def remove(self, product_id: str):
+        row = self.rows_by_id.pop(product_id, None)
+        if row is not None:
+            self.removed.add(row)
+
+    def query(self, title: str, exclude_id: str = None) -> list:
+        """
+        (key, estimated Jaccard, price) for indexed titles >= threshold, best
+        first; exclude_id leaves out that product's own entry
+        """
+        signature = minhash(title)
+        candidates = set()
+        for bucket in self._bands(signature):
+            candidates.update(self.buckets.get(bucket, ()))
+        candidates -= self.removed
+        if exclude_id is not None:
+            candidates.discard(self.rows_by_id.get(exclude_id))
+        if not candidates:
+            return []
+        rows = np.fromiter(candidates, dtype=np.int64)
+        similarity = (np.stack([self.signatures[r] for r in rows]) == signature).mean(axis=1)
+        keep = np.argsort(-similarity)
+        return [(self.keys[rows[i]], float(similarity[i]), self.prices[rows[i]])
+                for i in keep if similarity[i] >= self.threshold]
+
+    # --- Persistence ---
+
+    def save(self, path: str = INDEX_FILE):
+        """Write the DB products' entries (titles add()ed without an id aren't kept)"""
+        rows = sorted(self.rows_by_id.values())
+        np.savez(
+            path,
+            keys=np.array([self.keys[r] for r in rows], dtype=str),
+            ids=np.array([self.ids[r] for r in rows], dtype=str),
+            prices=np.array([np.nan if self.prices[r] is None else self.prices[r] for r in rows], dtype=float),
+            signatures=np.stack([self.signatures[r] for r in rows]) if rows else np.empty((0, NUM_PERM), dtype=np.uint32),
+            meta=np.array([self.watermark or ""]),
+        )
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE, threshold: float = THRESHOLD):
+        index = cls(threshold)
+        with np.load(path) as data:
+            if data["signatures"].shape[1:] != (NUM_PERM,):
+                raise ValueError("index was built with a different NUM_PERM")
+            if "ids" not in data:
+                raise ValueError("index predates product ids")
+            for key, product_id, price, signature in zip(data["keys"], data["ids"], data["prices"], data["signatures"]):
+                index._insert(str(key), None if np.isnan(price) else float(price), signature, str(product_id))
+            index.watermark = str(data["meta"][0]) or None
+        return index
+
+    @classmethod
+    def from_db(cls, connection, path: str = INDEX_FILE, threshold: float = THRESHOLD):
+        """
+        Cached index of "Product" titles: ids no longer in the DB are dropped
+        (found by an anti-join, the catalog's ids never come into Python) and
+        rows inserted or updated since the last run are (re-)indexed, streamed
+        from a server-side cursor
+        """
+        index = None
+        if os.path.exists(path):
+            try:
+                index = cls.load(path, threshold)
+            except Exception as e:
+                print(f"   ⚠ Title index cache unreadable ({e}), rebuilding")
+        if index is None:
+            index = cls(threshold)
+
+        # The cached ids go to the DB; only the ones it no longer has come back
+        gone = []
+        if index.rows_by_id:
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE TEMP TABLE title_index_ids (id text) ON COMMIT DROP")
+                copy_rows(cursor, "title_index_ids", ["id"], ((i,) for i in index.rows_by_id))
+                cursor.execute('''
+                    SELECT c.id FROM title_index_ids c
+                    WHERE NOT EXISTS (SELECT 1 FROM "Product" p WHERE p.id = c.id)
+                ''')
+                gone = [row[0] for row in cursor]
+            for product_id in gone:
+                index.remove(product_id)
+
+        # >= : rows committed later with the same timestamp are re-read, not missed
+        query = 'SELECT id, slug, title, price, "updatedAt" FROM "Product"'
+        params = ()
+        if index.watermark:
+            query += ' WHERE "updatedAt" >= %s'
+            params = (index.watermark,)
+        cursor = connection.cursor(name="title_index")
+        cursor.itersize = 5000
+        cursor.execute(query + ' ORDER BY "updatedAt"', params)
+        refreshed = 0
+        for product_id, slug, title, price, updated_at in cursor:
+            index.add(slug, title, float(price), product_id)
+            index.watermark = updated_at.isoformat()
+            refreshed += 1
+        cursor.close()
+        connection.commit()  # end the named cursor's transaction
+
+        index.save(path)
+        print(f"   🧭 Title index: {len(index)} titles ({refreshed} new or updated, {len(gone)} removed)")
+        return index
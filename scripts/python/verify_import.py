@@ -4,23 +4,28 @@ Compares:
 - adore_products.json
 - peora_products.json
 - amazon_in_products.json
+Each dump's slugs are COPYed into a temp table and matched with an
+anti-join, so the DB's slugs never have to be loaded into Python.
 """
 
 import psycopg2
 from dotenv import load_dotenv
-import json
 import os
 
+from dump_io import find_dump, iter_products
+from slugs import truncate_slug
+from bulk_load import copy_rows
+
 # Load environment variables
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 load_dotenv(os.path.join(BASE_DIR, ".env.local"))
 
 DUMP_DIR = os.path.join(BASE_DIR, "dump")
-JSON_FILES = [
-    "adore_products.json",
-    "peora_products.json",
-    "amazon_in_products.json"
+DUMPS = [
+    "adore_products",
+    "peora_products",
+    "amazon_in_products"
 ]
 
 def main():
@@ -39,58 +44,61 @@ def main():
         connection = psycopg2.connect(database_url)
         cursor = connection.cursor()
         
-        # 1. Get all slugs from DB
-        print("🔄 Fetching all product slugs from DB...")
-        cursor.execute('SELECT slug FROM "Product"')
-        db_slugs = {row[0] for row in cursor.fetchall()}
-        print(f"✅ DB contains {len(db_slugs)} products.\n")
+        # 1. Count products in the DB (the slugs stay there)
+        cursor.execute('SELECT COUNT(*) FROM "Product"')
+        db_total = cursor.fetchone()[0]
+        print(f"✅ DB contains {db_total} products.\n")
 
-        # 2. Check each JSON file
+        # 2. Stream each dump's slugs into a staging table and anti-join in SQL
+        cursor.execute("CREATE TEMP TABLE verify_staging (slug text) ON COMMIT DROP")
         total_missing = 0
         total_json_products = 0
 
-        for filename in JSON_FILES:
-            filepath = os.path.join(DUMP_DIR, filename)
+        for name in DUMPS:
+            filepath = find_dump(DUMP_DIR, name)
+            filename = os.path.basename(filepath)
             if not os.path.exists(filepath):
                 print(f"⚠️  File not found: {filename}")
                 continue
 
-            with open(filepath, "r", encoding="utf-8") as f:
-                products = json.load(f)
-            
-            total_json_products += len(products)
-            missing = []
-            found = 0
-            collisions = 0
-
-            for p in products:
-                slug = p["slug"][:60]
-                if slug in db_slugs:
-                    found += 1
-                else:
-                    missing.append(slug)
+            cursor.execute("TRUNCATE verify_staging")
+            count = copy_rows(cursor, "verify_staging", ["slug"],
+                              ((truncate_slug(p["slug"]),) for p in iter_products(filepath)))
+            cursor.execute('''
+                SELECT COUNT(*) FILTER (WHERE p.slug IS NOT NULL),
+                       COUNT(*) FILTER (WHERE p.slug IS NULL)
+                FROM verify_staging v LEFT JOIN "Product" p ON p.slug = v.slug
+            ''')
+            found, missing = cursor.fetchone()
             
             print(f"📊 Report for {filename}:")
-            print(f"   - Products in JSON: {len(products)}")
+            print(f"   - Products in JSON: {count}")
             print(f"   - Match in DB: {found}")
             if missing:
-                print(f"   - Missing/Collided: {len(missing)}")
+                print(f"   - Missing/Collided: {missing}")
                 # We show first 3 missing to differentiate between collision and missing
-                if len(missing) > 0:
-                    print(f"     (Samples: {missing[:3]})")
+                cursor.execute('''
+                    SELECT v.slug FROM verify_staging v
+                    WHERE NOT EXISTS (SELECT 1 FROM "Product" p WHERE p.slug = v.slug)
+                    LIMIT 3
+                ''')
+                print(f"     (Samples: {[row[0] for row in cursor.fetchall()]})")
             else:
                 print(f"   - ✅ 100% coverage!")
             print("-" * 30)
             
-            total_missing += len(missing)
+            total_json_products += count
+            total_missing += missing
+
+        connection.rollback()  # drop the staging table
 
         print(f"\n✨ FINAL SUMMARY:")
         print(f"   JSON Aggregate: {total_json_products} products")
-        print(f"   DB Current Total: {len(db_slugs)} products")
+        print(f"   DB Current Total: {db_total} products")
         
         # Explain why DB might be less (true duplicates)
-        if len(db_slugs) < total_json_products:
-            diff = total_json_products - len(db_slugs)
+        if db_total < total_json_products:
+            diff = total_json_products - db_total
             print(f"   💡 Note: {diff} products were likely skipped as True Duplicates (same name/price).")
 
         cursor.close()
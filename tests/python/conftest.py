@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import their siblings by module name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts" / "python"))
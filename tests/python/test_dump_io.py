@@ -0,0 +1,38 @@
+"""
+dump_io.iter_json_array against json.loads, with chunks small enough to cut
+every item
+
+    python -m pytest tests/python
+"""
+
+import io
+import json
+
+import pytest
+
+from dump_io import iter_json_array
+
+DOCUMENTS = [
+    '[1.5e10, 12.5, {"a": 1}, "x", -3, 0, true, null, [1, 2.25e-3]]',
+    '[ 123456789 ,\n 1.5E+10]',
+    '[{"title": "Ring, \\"gold\\"", "price": 1999.0}]',
+    '[]',
+    ' [ ] \n',
+    '[7]',
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", range(1, 12))
+def test_matches_json_loads(document, chunk_size):
+    assert list(iter_json_array(io.StringIO(document), chunk_size)) == json.loads(document)
+
+
+@pytest.mark.parametrize("document", [
+    "[12.5x]", "[1.5e]", "[12.", "[1, 2",
+    '[{"a": 1} {"b": 2}]', '["a" "b"]', "[1 2]", "[1,, 2]", "[, 1]", "[1, ]", '[{"a": 1}] {"b": 2}',
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_rejects_broken_arrays(document, chunk_size):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(document), chunk_size))
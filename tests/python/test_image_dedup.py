@@ -0,0 +1,43 @@
+"""
+image_dedup's numpy search against the bitwise_count it falls back from on
+numpy < 2
+
+    python -m pytest tests/python
+"""
+
+import numpy as np
+import pytest
+
+import image_dedup
+
+pytestmark = pytest.mark.skipif(not hasattr(np, "bitwise_count"), reason="needs numpy >= 2 to compare against")
+
+
+@pytest.fixture
+def hashes():
+    rng = np.random.default_rng(7)
+    values = rng.integers(0, 2 ** 63, size=2000, dtype=np.uint64) << np.uint64(1)
+    # plant near-duplicates: flip up to 5 bits of the first 200
+    for i in range(200):
+        flips = rng.choice(64, size=rng.integers(0, 6), replace=False)
+        values[1000 + i] = values[i] ^ np.uint64(sum(1 << int(b) for b in flips))
+    return values
+
+
+def test_popcount_fallback_matches_bitwise_count(hashes):
+    matrix = hashes[:50, None] ^ hashes[None, :70]
+    expected = np.bitwise_count(matrix), np.bitwise_count(hashes)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.delattr(np, "bitwise_count")
+        got = image_dedup.popcount(matrix), image_dedup.popcount(hashes)
+    for e, g in zip(expected, got):
+        assert g.shape == e.shape
+        assert np.array_equal(g, e)
+
+
+def test_near_duplicate_pairs_on_the_fallback(hashes, monkeypatch):
+    expected = image_dedup.near_duplicate_pairs(hashes, 6)
+    monkeypatch.delattr(np, "bitwise_count")
+    assert np.array_equal(image_dedup.near_duplicate_pairs(hashes, 6), expected)
+    found = {(i, j) for i, j, _ in expected.tolist()}
+    assert all((i, 1000 + i) in found for i in range(200))
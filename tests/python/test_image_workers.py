@@ -0,0 +1,61 @@
+"""
+check_images.run_checks and image_dedup.hash_images fail instead of hanging
+when the per-result callback (the DB write) raises
+
+    python -m pytest tests/python
+"""
+
+import asyncio
+
+import pytest
+
+import check_images
+import http_client
+import image_dedup
+
+
+async def pairs(count: int):
+    for i in range(count):
+        yield f"product-{i}", f"https://cdn.example/{i}.jpg"
+
+
+async def fail(*args):
+    raise RuntimeError("BrokenImage upsert failed")
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=10))
+
+
+def test_run_checks_raises_when_on_broken_fails(monkeypatch):
+    async def broken(session, url):
+        return 404, "http_404"
+
+    monkeypatch.setattr(check_images, "check_url", broken)
+    # far more pairs than the workers and the bounded queue can hold
+    with pytest.raises(RuntimeError, match="upsert failed"):
+        run(check_images.run_checks(pairs(500), fail, concurrency=2, per_host=2, timeout=5))
+
+
+def test_run_checks_counts_every_pair(monkeypatch):
+    async def check_url(session, url):
+        return (404, "http_404") if url.endswith("3.jpg") else (200, None)
+
+    broken = []
+
+    async def on_broken(*args):
+        broken.append(args)
+
+    monkeypatch.setattr(check_images, "check_url", check_url)
+    stats = run(check_images.run_checks(pairs(100), on_broken, concurrency=4, per_host=4, timeout=5))
+    assert stats["checked"] == 100 and stats["broken"] == len(broken) == 10
+
+
+def test_hash_images_raises_when_on_hash_fails(monkeypatch):
+    async def fetch(session, url):
+        return 200, {}, b"image"
+
+    monkeypatch.setattr(http_client, "fetch_async", fetch)
+    monkeypatch.setattr(image_dedup, "dhash", lambda data: 1)
+    with pytest.raises(RuntimeError, match="upsert failed"):
+        run(image_dedup.hash_images(pairs(500), fail, concurrency=2, per_host=2, timeout=5))
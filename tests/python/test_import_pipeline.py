@@ -0,0 +1,162 @@
+"""
+import_pipeline.load_parallel failure paths, with the connection pool and
+COPY mocked out (no database needed)
+
+    python -m pytest tests/python
+"""
+
+import argparse
+import threading
+
+import pytest
+
+import import_pipeline
+from import_pipeline import ImportPipeline, SourceAdapter
+
+
+class FakeCursor:
+    rowcount = 0
+
+    def execute(self, *args):
+        pass
+
+    def fetchone(self):
+        return (0,)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, minconn, maxconn, url):
+        pass
+
+    def getconn(self):
+        return FakeConnection()
+
+    def putconn(self, connection):
+        pass
+
+    def closeall(self):
+        pass
+
+
+class DumpAdapter(SourceAdapter):
+    """Yields `count` products, then fails like a truncated dump if `truncated`"""
+    name = "rings"
+    source = "test"
+    default_category = "rings"
+
+    def __init__(self, count: int, truncated: bool = False):
+        self.path = "rings.json"
+        self.count = count
+        self.truncated = truncated
+
+    def read(self):
+        for i in range(self.count):
+            yield {"title": f"Ring {i}", "price": 100, "image": f"https://cdn/{i}.jpg"}
+        if self.truncated:
+            raise ValueError("truncated dump")
+
+
+def run_with_timeout(target, seconds: float = 10):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = target()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "load_parallel hung"
+    return outcome
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    monkeypatch.setattr(import_pipeline, "ThreadedConnectionPool", FakePool)
+    monkeypatch.setattr(import_pipeline, "load_rows", lambda *args, **kwargs: None)
+
+
+def test_loads_every_row(fake_db):
+    pipeline = ImportPipeline(DumpAdapter(50), {"rings": "category-id"}, batch_size=4)
+    outcome = run_with_timeout(lambda: pipeline.load_parallel("postgresql://", workers=3))
+    assert outcome.get("result") == (50, 50)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_reader_failure_aborts_every_partition(fake_db, workers):
+    pipeline = ImportPipeline(DumpAdapter(10, truncated=True), {"rings": "category-id"}, batch_size=4)
+    outcome = run_with_timeout(lambda: pipeline.load_parallel("postgresql://", workers=workers))
+    assert isinstance(outcome.get("error"), ValueError)
+
+
+def test_partition_failure_is_raised(fake_db, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("COPY failed")
+
+    monkeypatch.setattr(import_pipeline, "load_rows", fail)
+    pipeline = ImportPipeline(DumpAdapter(50), {"rings": "category-id"}, batch_size=4)
+    outcome = run_with_timeout(lambda: pipeline.load_parallel("postgresql://", workers=2))
+    assert "result" not in outcome
+    assert "2 of 2 partitions" in str(outcome.get("error"))
+    assert pipeline.read_count == 50  # the reader went on to the end instead of hanging
+
+
+def test_failed_partition_keeps_the_live_catalog(fake_db, monkeypatch, tmp_path):
+    slug = import_pipeline.IMPORT_COLUMNS.index("slug")
+    calls = []
+
+    def fail_one_partition(cursor, table, columns, rows, **kwargs):
+        if any(row[slug] == "ring-7" for row in rows):
+            raise RuntimeError("COPY failed")
+
+    adapter = DumpAdapter(50)
+    adapter.path = str(tmp_path / "rings.json")
+    (tmp_path / "rings.json").write_text("[]")
+    monkeypatch.setattr(import_pipeline, "load_rows", fail_one_partition)
+    monkeypatch.setattr(import_pipeline, "database_url", lambda: "postgresql://")
+    monkeypatch.setattr(import_pipeline.psycopg2, "connect", lambda url: FakeConnection())
+    monkeypatch.setattr(import_pipeline, "ensure_categories", lambda cursor, categories: {"rings": "category-id"})
+    monkeypatch.setattr(import_pipeline, "create_shadow", lambda cursor, table: table + "_shadow")
+    monkeypatch.setattr(import_pipeline, "drop_shadow", lambda cursor, shadow: calls.append(("drop", shadow)))
+    for name in ("adopt_live_ids", "check_references", "build_indexes", "swap", "validate"):
+        monkeypatch.setattr(import_pipeline, name, lambda *args, name=name: calls.append((name,)))
+
+    args = argparse.Namespace(batch=4, workers=3, partition="slug", upsert=False, swap=True)
+    outcome = run_with_timeout(lambda: import_pipeline.run_import(adapter, [], args))
+    assert "1 of 3 partitions" in str(outcome.get("error"))
+    assert calls == [("drop", "Product_shadow")]
+
+
+def test_content_hash_ignores_the_scrapers_random_fields():
+    adapter = DumpAdapter(1)
+    product = {"title": "Ring 0", "price": 100, "image": "https://cdn/0.jpg", "categorySlug": "rings"}
+    scraped = [dict(product, rating=r, reviewsCount=r * 10, itemsLeft=r + 10, isFeatured=r > 3, isNew=r > 4)
+               for r in (1, 5)]
+    first, second = (import_pipeline.content_hash(adapter.normalize(p)) for p in scraped)
+    assert first == second
+    assert import_pipeline.content_hash(adapter.normalize(dict(product, price=90))) != first
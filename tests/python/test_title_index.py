@@ -0,0 +1,31 @@
+"""
+title_index.TitleIndex lookups
+
+    python -m pytest tests/python
+"""
+
+from title_index import TitleIndex
+
+
+def test_query_finds_reworded_titles():
+    index = TitleIndex()
+    index.add("peora-ring-1", "Peora Gold Plated Ring for Women", 499, "id-1")
+    index.add("kundan-jhumka", "Kundan Jhumka Earrings", 899, "id-2")
+    matches = index.query("Gold-Plated Peora Rings For Women")
+    assert [m[0] for m in matches] == ["peora-ring-1"]
+
+
+def test_query_can_leave_out_the_products_own_entry():
+    index = TitleIndex()
+    index.add("chaitra-pearl-neckpiece-1", "Chaitra Pearl Neckpiece With Earring", 1299, "id-1")
+    assert index.query("Chaitra Pearl Neckpiece With Earring", exclude_id="id-1") == []
+    assert index.query("Chaitra Pearl Neckpiece With Earring", exclude_id="id-2")
+
+
+def test_add_replaces_and_remove_drops_an_id():
+    index = TitleIndex()
+    index.add("ring", "Silver Toe Ring", 199, "id-1")
+    index.add("ring", "Kundan Choker Necklace", 199, "id-1")
+    assert index.query("Silver Toe Ring") == []
+    index.remove("id-1")
+    assert len(index) == 0 and index.query("Kundan Choker Necklace") == []